@@ -3,130 +3,209 @@ Configuration Management Module
 Load all configuration items from .env files
 """
 
+from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 import os
 
 # Load Environment Variables
 load_dotenv()
 
+
+def _envbool(name, default):
+    """Read a "true"/"false" environment flag"""
+    return os.getenv(name, default).lower() == "true"
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Application Configuration Class"""
-    
+    """Application Configuration Class (built once via Config.from_env())"""
+
     # ==================== Qwen LLM Configuration ====================
-    DASHSCOPE_API_KEY = os.getenv("DASHSCOPE_API_KEY")
-    QWEN_MODEL = os.getenv("QWEN_MODEL_NAME", "qwen-turbo")
-    
-     # Temperature Parameters
-    TEMP_CONVERSATION = float(os.getenv("QWEN_TEMPERATURE_CONVERSATION", "0.0"))
-    TEMP_SCORING_POS = float(os.getenv("QWEN_TEMPERATURE_SCORING_POS", "0.2"))
-    TEMP_SCORING_NEG = float(os.getenv("QWEN_TEMPERATURE_SCORING_NEG", "0.0"))
-    TEMP_SEMANTIC = float(os.getenv("QWEN_TEMPERATURE_SEMANTIC", "0.4"))
-    TEMP_ROUTER = float(os.getenv("QWEN_TEMPERATURE_ROUTER", "0.0"))
-    
+    DASHSCOPE_API_KEY: Optional[str]
+    QWEN_MODEL: str
+
+    # Temperature Parameters
+    TEMP_CONVERSATION: float
+    TEMP_SCORING_POS: float
+    TEMP_SCORING_NEG: float
+    TEMP_SEMANTIC: float
+    TEMP_ROUTER: float
+
     # ==================== Vector Embedding Configuration ====================
-    QWEN_EMBEDDING_MODEL = os.getenv("QWEN_EMBEDDING_MODEL", "text-embedding-v2")
-    VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "db5")
-    
+    QWEN_EMBEDDING_MODEL: str
+    VECTOR_DB_PATH: str
+
     # ==================== Qwen TTS Configuration ====================
-    TTS_PROVIDER = os.getenv("TTS_PROVIDER", "qwen")
-    QWEN_TTS_MODEL = os.getenv("QWEN_TTS_MODEL", "qwen3-tts-flash")
-    QWEN_TTS_VOICE = os.getenv("QWEN_TTS_VOICE", "Cherry")
-    QWEN_TTS_LANGUAGE = os.getenv("QWEN_TTS_LANGUAGE", "Chinese")
-    QWEN_TTS_STREAM = os.getenv("QWEN_TTS_STREAM", "true").lower() == "true"
-    USE_GTTS_FALLBACK = os.getenv("USE_GTTS_FALLBACK", "true").lower() == "true"
-    
+    TTS_PROVIDER: str
+    QWEN_TTS_MODEL: str
+    QWEN_TTS_VOICE: str
+    QWEN_TTS_LANGUAGE: str
+    QWEN_TTS_STREAM: bool
+    USE_GTTS_FALLBACK: bool
+
     # ==================== RAG Retrieval Configuration ====================
-    RAG_MMR_K = int(os.getenv("RAG_MMR_K", "4"))
-    RAG_MMR_FETCH_K = int(os.getenv("RAG_MMR_FETCH_K", "20"))
-    RAG_MMR_LAMBDA = float(os.getenv("RAG_MMR_LAMBDA", "0.5"))
-    ENABLE_HISTORY_DEDUP = os.getenv("ENABLE_HISTORY_DEDUP", "true").lower() == "true"
-    MAX_HISTORY_ROUNDS = int(os.getenv("MAX_HISTORY_ROUNDS", "10"))
-    
+    RAG_MMR_K: int
+    RAG_MMR_FETCH_K: int
+    RAG_MMR_LAMBDA: float
+    ENABLE_HISTORY_DEDUP: bool
+    MAX_HISTORY_ROUNDS: int
+
     # Hybrid Search (Optional)
-    ENABLE_HYBRID_SEARCH = os.getenv("ENABLE_HYBRID_SEARCH", "false").lower() == "true"
-    HYBRID_VECTOR_WEIGHT = float(os.getenv("HYBRID_VECTOR_WEIGHT", "0.6"))
-    HYBRID_BM25_WEIGHT = float(os.getenv("HYBRID_BM25_WEIGHT", "0.4"))
-    
+    ENABLE_HYBRID_SEARCH: bool
+    HYBRID_VECTOR_WEIGHT: float
+    HYBRID_BM25_WEIGHT: float
+
     # Reorder (Optional)
-    ENABLE_RERANKING = os.getenv("ENABLE_RERANKING", "false").lower() == "true"
-    RERANKING_MODEL = os.getenv("RERANKING_MODEL", "cohere")
-    COHERE_API_KEY = os.getenv("COHERE_API_KEY")
-    COHERE_RERANK_MODEL = os.getenv("COHERE_RERANK_MODEL", "rerank-english-v3.0")
-    COHERE_RERANK_TOP_N = int(os.getenv("COHERE_RERANK_TOP_N", "3"))
-    
+    ENABLE_RERANKING: bool
+    RERANKING_MODEL: str
+    COHERE_API_KEY: Optional[str]
+    COHERE_RERANK_MODEL: str
+    COHERE_RERANK_TOP_N: int
+
     # ==================== Database Configuration ====================
-    SUPABASE_URL = os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-    SUPABASE_TABLE_NAME = os.getenv("SUPABASE_TABLE_NAME", "interactions")
-    
+    SUPABASE_URL: Optional[str]
+    SUPABASE_KEY: Optional[str]
+    SUPABASE_TABLE_NAME: str
+
     # ==================== Agent Configuration ====================
-    USE_WEB_SEARCH = os.getenv("USE_WEB_SEARCH", "true").lower() == "true"
-    WEB_SEARCH_PROVIDER = os.getenv("WEB_SEARCH_PROVIDER", "duckduckgo")
-    ENABLE_SMART_ROUTING = os.getenv("ENABLE_SMART_ROUTING", "true").lower() == "true"
-    ROUTING_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTING_CONFIDENCE_THRESHOLD", "0.7"))
-    
+    USE_WEB_SEARCH: bool
+    WEB_SEARCH_PROVIDER: str
+    ENABLE_SMART_ROUTING: bool
+    ROUTING_CONFIDENCE_THRESHOLD: float
+
     # Tavily（Optional）
-    TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-    TAVILY_MAX_RESULTS = int(os.getenv("TAVILY_MAX_RESULTS", "3"))
-    
+    TAVILY_API_KEY: Optional[str]
+    TAVILY_MAX_RESULTS: int
+
     # ==================== Application Configuration ====================
-    APP_NAME = os.getenv("APP_NAME", "Monk Seal")
-    APP_VERSION = os.getenv("APP_VERSION", "2.0.0")
-    APP_DEBUG = os.getenv("APP_DEBUG", "false").lower() == "true"
-    
-    SESSION_TIMEOUT = int(os.getenv("SESSION_TIMEOUT", "3600"))
-    MAX_INTIMACY_SCORE = int(os.getenv("MAX_INTIMACY_SCORE", "6"))
-    
+    APP_NAME: str
+    APP_VERSION: str
+    APP_DEBUG: bool
+
+    SESSION_TIMEOUT: int
+    MAX_INTIMACY_SCORE: int
+
     # ==================== Function Switch ====================
-    FEATURE_QWEN_TTS = os.getenv("FEATURE_QWEN_TTS", "true").lower() == "true"
-    FEATURE_SMART_AGENT = os.getenv("FEATURE_SMART_AGENT", "true").lower() == "true"
-    FEATURE_HYBRID_RAG = os.getenv("FEATURE_HYBRID_RAG", "false").lower() == "true"
-    FEATURE_GIFT_SYSTEM = os.getenv("FEATURE_GIFT_SYSTEM", "true").lower() == "true"
-    FEATURE_VOICE_SELECTION = os.getenv("FEATURE_VOICE_SELECTION", "true").lower() == "true"
-    
+    FEATURE_QWEN_TTS: bool
+    FEATURE_SMART_AGENT: bool
+    FEATURE_HYBRID_RAG: bool
+    FEATURE_GIFT_SYSTEM: bool
+    FEATURE_VOICE_SELECTION: bool
+
     # ==================== Backup Configuration ====================
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    ENABLE_OPENAI_FALLBACK = os.getenv("ENABLE_OPENAI_FALLBACK", "false").lower() == "true"
-    FALLBACK_VECTOR_DB_PATH = os.getenv("FALLBACK_VECTOR_DB_PATH", "db5")
-    
+    OPENAI_API_KEY: Optional[str]
+    ENABLE_OPENAI_FALLBACK: bool
+    FALLBACK_VECTOR_DB_PATH: str
+
     # ==================== Log Configuration ====================
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-    LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
-    ENABLE_API_LOGGING = os.getenv("ENABLE_API_LOGGING", "true").lower() == "true"
-    
+    LOG_LEVEL: str
+    LOG_FILE: str
+    ENABLE_API_LOGGING: bool
+
     @classmethod
-    def validate(cls):
+    def from_env(cls):
+        """Parse the environment once and return a populated configuration"""
+        return cls(
+            DASHSCOPE_API_KEY=os.getenv("DASHSCOPE_API_KEY"),
+            QWEN_MODEL=os.getenv("QWEN_MODEL_NAME", "qwen-turbo"),
+
+            TEMP_CONVERSATION=float(os.getenv("QWEN_TEMPERATURE_CONVERSATION", "0.0")),
+            TEMP_SCORING_POS=float(os.getenv("QWEN_TEMPERATURE_SCORING_POS", "0.2")),
+            TEMP_SCORING_NEG=float(os.getenv("QWEN_TEMPERATURE_SCORING_NEG", "0.0")),
+            TEMP_SEMANTIC=float(os.getenv("QWEN_TEMPERATURE_SEMANTIC", "0.4")),
+            TEMP_ROUTER=float(os.getenv("QWEN_TEMPERATURE_ROUTER", "0.0")),
+
+            QWEN_EMBEDDING_MODEL=os.getenv("QWEN_EMBEDDING_MODEL", "text-embedding-v2"),
+            VECTOR_DB_PATH=os.getenv("VECTOR_DB_PATH", "db5"),
+
+            TTS_PROVIDER=os.getenv("TTS_PROVIDER", "qwen"),
+            QWEN_TTS_MODEL=os.getenv("QWEN_TTS_MODEL", "qwen3-tts-flash"),
+            QWEN_TTS_VOICE=os.getenv("QWEN_TTS_VOICE", "Cherry"),
+            QWEN_TTS_LANGUAGE=os.getenv("QWEN_TTS_LANGUAGE", "Chinese"),
+            QWEN_TTS_STREAM=_envbool("QWEN_TTS_STREAM", "true"),
+            USE_GTTS_FALLBACK=_envbool("USE_GTTS_FALLBACK", "true"),
+
+            RAG_MMR_K=int(os.getenv("RAG_MMR_K", "4")),
+            RAG_MMR_FETCH_K=int(os.getenv("RAG_MMR_FETCH_K", "20")),
+            RAG_MMR_LAMBDA=float(os.getenv("RAG_MMR_LAMBDA", "0.5")),
+            ENABLE_HISTORY_DEDUP=_envbool("ENABLE_HISTORY_DEDUP", "true"),
+            MAX_HISTORY_ROUNDS=int(os.getenv("MAX_HISTORY_ROUNDS", "10")),
+
+            ENABLE_HYBRID_SEARCH=_envbool("ENABLE_HYBRID_SEARCH", "false"),
+            HYBRID_VECTOR_WEIGHT=float(os.getenv("HYBRID_VECTOR_WEIGHT", "0.6")),
+            HYBRID_BM25_WEIGHT=float(os.getenv("HYBRID_BM25_WEIGHT", "0.4")),
+
+            ENABLE_RERANKING=_envbool("ENABLE_RERANKING", "false"),
+            RERANKING_MODEL=os.getenv("RERANKING_MODEL", "cohere"),
+            COHERE_API_KEY=os.getenv("COHERE_API_KEY"),
+            COHERE_RERANK_MODEL=os.getenv("COHERE_RERANK_MODEL", "rerank-english-v3.0"),
+            COHERE_RERANK_TOP_N=int(os.getenv("COHERE_RERANK_TOP_N", "3")),
+
+            SUPABASE_URL=os.getenv("SUPABASE_URL"),
+            SUPABASE_KEY=os.getenv("SUPABASE_KEY"),
+            SUPABASE_TABLE_NAME=os.getenv("SUPABASE_TABLE_NAME", "interactions"),
+
+            USE_WEB_SEARCH=_envbool("USE_WEB_SEARCH", "false"),
+            WEB_SEARCH_PROVIDER=os.getenv("WEB_SEARCH_PROVIDER", "duckduckgo"),
+            ENABLE_SMART_ROUTING=_envbool("ENABLE_SMART_ROUTING", "true"),
+            ROUTING_CONFIDENCE_THRESHOLD=float(os.getenv("ROUTING_CONFIDENCE_THRESHOLD", "0.7")),
+
+            TAVILY_API_KEY=os.getenv("TAVILY_API_KEY"),
+            TAVILY_MAX_RESULTS=int(os.getenv("TAVILY_MAX_RESULTS", "3")),
+
+            APP_NAME=os.getenv("APP_NAME", "Monk Seal"),
+            APP_VERSION=os.getenv("APP_VERSION", "2.0.0"),
+            APP_DEBUG=_envbool("APP_DEBUG", "false"),
+
+            SESSION_TIMEOUT=int(os.getenv("SESSION_TIMEOUT", "3600")),
+            MAX_INTIMACY_SCORE=int(os.getenv("MAX_INTIMACY_SCORE", "6")),
+
+            FEATURE_QWEN_TTS=_envbool("FEATURE_QWEN_TTS", "true"),
+            FEATURE_SMART_AGENT=_envbool("FEATURE_SMART_AGENT", "true"),
+            FEATURE_HYBRID_RAG=_envbool("FEATURE_HYBRID_RAG", "false"),
+            FEATURE_GIFT_SYSTEM=_envbool("FEATURE_GIFT_SYSTEM", "true"),
+            FEATURE_VOICE_SELECTION=_envbool("FEATURE_VOICE_SELECTION", "true"),
+
+            OPENAI_API_KEY=os.getenv("OPENAI_API_KEY"),
+            ENABLE_OPENAI_FALLBACK=_envbool("ENABLE_OPENAI_FALLBACK", "false"),
+            FALLBACK_VECTOR_DB_PATH=os.getenv("FALLBACK_VECTOR_DB_PATH", "db5"),
+
+            LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO"),
+            LOG_FILE=os.getenv("LOG_FILE", "logs/app.log"),
+            ENABLE_API_LOGGING=_envbool("ENABLE_API_LOGGING", "true"),
+        )
+
+    def validate(self):
         """Verification requires configuration"""
         required_configs = {
-            'DASHSCOPE_API_KEY': cls.DASHSCOPE_API_KEY,
-            'SUPABASE_URL': cls.SUPABASE_URL,
-            'SUPABASE_KEY': cls.SUPABASE_KEY,
+            'DASHSCOPE_API_KEY': self.DASHSCOPE_API_KEY,
+            'SUPABASE_URL': self.SUPABASE_URL,
+            'SUPABASE_KEY': self.SUPABASE_KEY,
         }
-        
+
         missing = [key for key, value in required_configs.items() if not value]
-        
+
         if missing:
             raise ValueError(f"Missing required configuration: {', '.join(missing)}")
-        
+
         return True
-    
-    @classmethod
-    def print_config(cls):
-        """Print current configuration (for debugging)）"""
+
+    def print_config(self):
+        """Print current configuration (for debugging)"""
         print("=" * 50)
         print("Current Configuration")
         print("=" * 50)
-        print(f"Qwen Model: {cls.QWEN_MODEL}")
-        print(f"TTS Provider: {cls.TTS_PROVIDER}")
-        print(f"TTS Voice: {cls.QWEN_TTS_VOICE}")
-        print(f"Vector DB: {cls.VECTOR_DB_PATH}")
-        print(f"Smart Agent: {cls.FEATURE_SMART_AGENT}")
-        print(f"Voice Selection: {cls.FEATURE_VOICE_SELECTION}")
+        print(f"Qwen Model: {self.QWEN_MODEL}")
+        print(f"TTS Provider: {self.TTS_PROVIDER}")
+        print(f"TTS Voice: {self.QWEN_TTS_VOICE}")
+        print(f"Vector DB: {self.VECTOR_DB_PATH}")
+        print(f"Smart Agent: {self.FEATURE_SMART_AGENT}")
+        print(f"Voice Selection: {self.FEATURE_VOICE_SELECTION}")
         print("=" * 50)
 
-# Create a global configuration instance
-config = Config()
+# Create the global configuration instance (environment is parsed once, here)
+config = Config.from_env()
 
 # Automatic verification (optional; comment out to skip)
 # config.validate()
-
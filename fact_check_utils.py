@@ -4,76 +4,155 @@ Generates summary text by combining knowledge base retrieval with optional web s
 """
 
 import os
-from langchain_community.llms import Tongyi
+import re
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Final
 from dotenv import load_dotenv
+from config import config
+
+try:
+    import ahocorasick  # Optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
 
 load_dotenv()
 
-def get_friendly_filename(source_file):
+# Tongyi pulls in a large part of langchain_community; import it on first use
+_Tongyi = None
+
+
+def _tongyi_class():
+    """Import and cache the Tongyi LLM class on first use"""
+    global _Tongyi
+    if _Tongyi is None:
+        from langchain_community.llms import Tongyi
+        _Tongyi = Tongyi
+    return _Tongyi
+
+
+@lru_cache(maxsize=4)
+def _get_tongyi(model, temperature):
     """
-    Convert technical source file names to user-friendly names
+    Build a Tongyi client once per (model, temperature) and reuse it across calls
     """
-    filename_mapping = {
-        # Your Excel mappings
-        '41_S_1-43.pdf': 'Simons et al 2013 - Diablotin Pterodroma hasitata Biography of the Black-capped Petrel',
-        '2024FloodZinos1stBritain.pdf': 'Flood 2024 - Zino\'s Petrel off Scilly new to Britain',
-        '3906_pterodroma_madeira.pdf': 'BirdLife International 2021 - Pterodroma madeira Zinos Petrel',
-        'Conservation_of_Zinos_petrel_Pterodroma.pdf': 'Zino et al 2001 - Conservation of Zinos petrel Pterodroma madeira in Madeira',
-        'conservation-of-zinos-petrel-pterodroma-madeira-in-the-archipelago-of-madeira.pdf': 'Zino et al 2001 - Conservation of Zinos petrel Pterodroma madeira in Madeira',
-        'Madeira_Zinos_Petrel_2010_0.pdf': 'BirdLife International 2010 - Race against the clock to save Zinos Petrel',
-        'Madeira-2021.pdf': 'Flood 2021 - ORIOLE BIRDING TOUR TO MADEIRA ENDEMICS AND SEABIRDS 5-9 JULY 2021',
-        'madeira-2024-text.pdf': 'Koppenol 2024 - MADEIRA TOUR REPORT 2024',
-        'Madeira2004_NB.pdf': 'Brinkley 2004 - Zinos Petrel at sea off Madeira 27 April 2004',
-        'pterodromaRefs_v1.15.pdf': 'Hobbs 2017 - Pterodroma Reference List - Comprehensive bibliography of gadfly petrels',
-        'Shirihai_Jamaica_AtSea_Nov09.pdf': 'Shirihai et al 2010 - Jamaica Petrel Pterodroma caribbaea Pelagic expedition report',
-        'srep23447.pdf': 'Ramos et al 2016 - Global spatial ecology of three closely related gadfly petrels',
-        'The_separation_of_Pterodroma_madeira_Zin.pdf': 'Zino et al 2008 - The separation of Pterodroma madeira from Pterodroma feae',
-        'v36n6p586.pdf': 'Patteson & Brinkley 2004 - A Petrel Primer - The Gadflies of North Carolina',
-        'v40n6p28.pdf': 'Hess 2008 - Feas or Zinos Petrel',
-        'Zino_s_Petrel_Pterodroma_madeira_off_Nor.pdf': 'Patteson et al 2013 - Zinos Petrel Pterodroma madeira off North Carolina - First for North America',
-        'zinos-petrel-1995.pdf': 'Zino et al 1995 - Action Plan for Zinos Petrel Pterodroma madeira',
-        'zlae123.pdf': 'Rando et al 2024 - Pterodroma zinorum Biography of an extinct Azorean petrel',
-        
-        # Default fallback
-        'unknown': 'Unknown Document'
-    }
-    
-    base_name = os.path.basename(source_file) if source_file else 'unknown'
-    return filename_mapping.get(base_name, base_name.replace('_', ' ').replace('-', ' ').title())
+    # main.py may inject the key from st.secrets after config was loaded
+    api_key = config.DASHSCOPE_API_KEY or os.getenv("DASHSCOPE_API_KEY")
+    Tongyi = _tongyi_class()
+    return Tongyi(
+        model_name=model,
+        temperature=temperature,
+        dashscope_api_key=api_key
+    )
 
 
-def summarize_fact_check(question, retrieved_docs, ai_answer, language="English"):
+# Related Keywords (Biology/Conservation)
+RELEVANT_KEYWORDS = (
+    'petrel', 'bird', 'seabird', 'species', 'madeira', 'conservation',
+    'endangered', 'breeding', 'habitat', 'ornithology', 'wildlife',
+    'pterodroma', 'freira', 'endemic', 'biodiversity'
+)
+
+# Irrelevant Keywords (Technology/Programming Related)
+IRRELEVANT_KEYWORDS = (
+    'framework', 'programming', 'code', 'software', 'api', 'rust',
+    '编程', '框架', '开发', '代码', 'github', 'npm', 'cargo'
+)
+
+# Key biological/conservation-related vocabulary used to refine web search queries
+BIO_KEYWORDS = (
+    'seabird', 'petrel', 'bird', 'endemic', 'madeira', 'conservation',
+    'endangered', 'breeding', 'nesting', 'habitat', 'species', 'population'
+)
+
+# Compiled once at import: a single case-insensitive pass per search result
+_RELEVANT_RE = re.compile("|".join(map(re.escape, RELEVANT_KEYWORDS)), re.IGNORECASE)
+_IRRELEVANT_RE = re.compile("|".join(map(re.escape, IRRELEVANT_KEYWORDS)), re.IGNORECASE)
+_BIO_RE = re.compile("|".join(map(re.escape, BIO_KEYWORDS)), re.IGNORECASE)
+
+
+# Search result fields read for both filtering and display (missing keys get these defaults)
+_RESULT_DEFAULTS = {'title': 'Unknown', 'body': '', 'href': ''}
+_RESULT_FIELDS = itemgetter('title', 'body', 'href')
+
+
+def _build_automaton(keywords):
+    """Build an Aho-Corasick automaton over lowercase keywords (None if pyahocorasick is missing)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword.lower(), keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_RELEVANT_AC = _build_automaton(RELEVANT_KEYWORDS)
+_IRRELEVANT_AC = _build_automaton(IRRELEVANT_KEYWORDS)
+
+
+def _contains_keyword(text, automaton, pattern):
     """
-    Intelligent Summarization of Fact-Checked Content
-    
-    Args:
-        question: User query
-        retrieved_docs: List of retrieved documents
-        ai_answer: AI response
-        language: Language (English/Portuguese)
-    
-    Returns:
-        str: Summary text
+    Check whether text contains any keyword, stopping at the first hit
+    (the automaton expects lowercase text; the regex fallback is case-insensitive)
     """
-    # Extract document content
-    doc_contents = []
-    sources = []
-    
-    for i, doc in enumerate(retrieved_docs[:3], 1):  # Use a maximum of 3 documents
-        content = doc.page_content[:500]  # Each document is limited to 500 characters.
-        source = doc.metadata.get('source_file', 'Unknown')
-        page = doc.metadata.get('page', 'N/A')
+    if automaton is not None:
+        return next(automaton.iter(text), None) is not None
+    return pattern.search(text) is not None
 
-        friendly_name = get_friendly_filename(source)
-        
-        doc_contents.append(f"[Source {i}: {friendly_name}, Page {page}]\n{content}")
-        sources.append(f"{friendly_name} (p.{page})")
-    
-    combined_docs = "\n\n".join(doc_contents)
-    
-    # Prompt for Building Abstracts
-    if language == "Portuguese":
-        prompt = f"""
+# Human-readable citations, one entry per distinct publication (built once at import)
+CANONICAL_NAMES: Final[tuple[str, ...]] = (
+    'Unknown Document',
+    'Simons et al 2013 - Diablotin Pterodroma hasitata Biography of the Black-capped Petrel',
+    'Flood 2024 - Zino\'s Petrel off Scilly new to Britain',
+    'BirdLife International 2021 - Pterodroma madeira Zinos Petrel',
+    'Zino et al 2001 - Conservation of Zinos petrel Pterodroma madeira in Madeira',
+    'BirdLife International 2010 - Race against the clock to save Zinos Petrel',
+    'Flood 2021 - ORIOLE BIRDING TOUR TO MADEIRA ENDEMICS AND SEABIRDS 5-9 JULY 2021',
+    'Koppenol 2024 - MADEIRA TOUR REPORT 2024',
+    'Brinkley 2004 - Zinos Petrel at sea off Madeira 27 April 2004',
+    'Hobbs 2017 - Pterodroma Reference List - Comprehensive bibliography of gadfly petrels',
+    'Shirihai et al 2010 - Jamaica Petrel Pterodroma caribbaea Pelagic expedition report',
+    'Ramos et al 2016 - Global spatial ecology of three closely related gadfly petrels',
+    'Zino et al 2008 - The separation of Pterodroma madeira from Pterodroma feae',
+    'Patteson & Brinkley 2004 - A Petrel Primer - The Gadflies of North Carolina',
+    'Hess 2008 - Feas or Zinos Petrel',
+    'Patteson et al 2013 - Zinos Petrel Pterodroma madeira off North Carolina - First for North America',
+    'Zino et al 1995 - Action Plan for Zinos Petrel Pterodroma madeira',
+    'Rando et al 2024 - Pterodroma zinorum Biography of an extinct Azorean petrel',
+)
+
+# Source file name -> index into CANONICAL_NAMES (several files may share one publication)
+BASENAME_TO_CANON: Final[dict[str, int]] = {
+    # Your Excel mappings
+    '41_S_1-43.pdf': 1,
+    '2024FloodZinos1stBritain.pdf': 2,
+    '3906_pterodroma_madeira.pdf': 3,
+    'Conservation_of_Zinos_petrel_Pterodroma.pdf': 4,
+    'conservation-of-zinos-petrel-pterodroma-madeira-in-the-archipelago-of-madeira.pdf': 4,
+    'Madeira_Zinos_Petrel_2010_0.pdf': 5,
+    'Madeira-2021.pdf': 6,
+    'madeira-2024-text.pdf': 7,
+    'Madeira2004_NB.pdf': 8,
+    'pterodromaRefs_v1.15.pdf': 9,
+    'Shirihai_Jamaica_AtSea_Nov09.pdf': 10,
+    'srep23447.pdf': 11,
+    'The_separation_of_Pterodroma_madeira_Zin.pdf': 12,
+    'v36n6p586.pdf': 13,
+    'v40n6p28.pdf': 14,
+    'Zino_s_Petrel_Pterodroma_madeira_off_Nor.pdf': 15,
+    'zinos-petrel-1995.pdf': 16,
+    'zlae123.pdf': 17,
+    
+    # Default fallback
+    'unknown': 0
+}
+
+
+# Fact-check summary prompts (filled with str.format in summarize_fact_check)
+_PROMPT_PT = """
         Tu és um verificador de factos científico. Com base nos documentos fornecidos, cria um resumo claro e conciso.
 
         **Pergunta do utilizador:** {question}
@@ -92,8 +171,8 @@ def summarize_fact_check(question, retrieved_docs, ai_answer, language="English"
 
         **Resumo factual:**
         """
-    else:
-        prompt = f"""
+
+_PROMPT_EN = """
         You are a scientific fact-checker. Based on the provided documents, create a clear and concise summary.
 
         **User's Question:** {question}
@@ -112,37 +191,104 @@ def summarize_fact_check(question, retrieved_docs, ai_answer, language="English"
 
         **Factual Summary:**
         """
+
+
+def get_friendly_filename(source_file):
+    """
+    Convert technical source file names to user-friendly names
+    """
+    # Strip any directory part; handles both '/' and Windows '\\' separators
+    base_name = source_file.rpartition('/')[2].rpartition('\\')[2] if source_file else 'unknown'
+    canon_id = BASENAME_TO_CANON.get(base_name)
+    if canon_id is not None:
+        return CANONICAL_NAMES[canon_id]
+    return base_name.replace('_', ' ').replace('-', ' ').title()
+
+
+def _project_docs(docs, n):
+    """
+    Extract (content excerpt, friendly source name, page) from the first n documents in one pass
+    """
+    return [
+        (
+            doc.page_content[:500],  # Each document is limited to 500 characters.
+            get_friendly_filename(doc.metadata.get('source_file', 'Unknown')),
+            doc.metadata.get('page', 'N/A')
+        )
+        for doc in islice(docs, n)
+    ]
+
+
+def summarize_fact_check(question, retrieved_docs, ai_answer, language="English"):
+    """
+    Intelligent Summarization of Fact-Checked Content
     
-    # Generate summaries using Qwen LLM
+    Args:
+        question: User query
+        retrieved_docs: List of retrieved documents
+        ai_answer: AI response
+        language: Language (English/Portuguese)
+    
+    Yields:
+        str: Summary text chunks as the LLM produces them, then the source citation
+    """
+    # Extract document content
+    projected = _project_docs(retrieved_docs, 3)  # Use a maximum of 3 documents
+    doc_contents = []
+    sources = []
+    
+    for i, (content, friendly_name, page) in enumerate(projected, 1):
+        doc_contents.append(f"[Source {i}: {friendly_name}, Page {page}]\n{content}")
+        sources.append(f"{friendly_name} (p.{page})")
+    
+    combined_docs = "\n\n".join(doc_contents)
+    # Files of the same publication share a citation; list each one only once
+    sources = list(dict.fromkeys(sources))
+    
+    # Prompt for Building Abstracts
+    prompt = (_PROMPT_PT if language == "Portuguese" else _PROMPT_EN).format(
+        question=question, ai_answer=ai_answer, combined_docs=combined_docs
+    )
+    
+    # Generate summaries using Qwen LLM (streamed, so the first words show up early)
+    streamed = False
     try:
-        api_key = os.getenv("DASHSCOPE_API_KEY")
-        llm = Tongyi(
-            model_name=os.getenv("QWEN_MODEL_NAME", "qwen-turbo"),
-            temperature=0.3,  # Lower temperatures ensure factual accuracy.
-            dashscope_api_key=api_key
-        )
+        llm = _get_tongyi(config.QWEN_MODEL, 0.3)  # Lower temperatures ensure factual accuracy.
         
-        summary = llm.invoke(prompt)
+        # Trailing whitespace is held back until more text follows, so the summary
+        # ends stripped before the source citation (as summary.strip() did)
+        pending = ""
+        for chunk in llm.stream(prompt):
+            if not streamed:
+                # Drop the leading whitespace the model tends to emit
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                streamed = True
+            text = pending + chunk
+            stripped = text.rstrip()
+            pending = text[len(stripped):]
+            if stripped:
+                yield stripped
         
         # Add source citation
         if language == "Portuguese":
-            source_text = f"\n\n📚 **Fontes:** {', '.join(sources)}"
+            yield f"\n\n📚 **Fontes:** {', '.join(sources)}"
         else:
-            source_text = f"\n\n📚 **Sources:** {', '.join(sources)}"
-        
-        return summary.strip() + source_text
+            yield f"\n\n📚 **Sources:** {', '.join(sources)}"
     
     except Exception as e:
         print(f"[Fact-Check] Abstract generation failed: {str(e)}")
+        if streamed:
+            # Part of the summary has already been shown; stop there
+            return
         # Downgrade: Return simplified document content
-        source = retrieved_docs[0].metadata.get('source_file', 'Unknown')
-        page = retrieved_docs[0].metadata.get('page', 'N/A')
-        friendly_name = get_friendly_filename(source)
+        content, friendly_name, page = projected[0]
         
         if language == "Portuguese":
-            return f"📄 Informação extraída dos documentos:\n\n{retrieved_docs[0].page_content[:200]}...\n\n📚 Fonte: {friendly_name} (p.{page})"
+            yield f"📄 Informação extraída dos documentos:\n\n{content[:200]}...\n\n📚 Fonte: {friendly_name} (p.{page})"
         else:
-            return f"📄 Information from documents:\n\n{retrieved_docs[0].page_content[:200]}...\n\n📚 Source: {friendly_name} (p.{page})"
+            yield f"📄 Information from documents:\n\n{content[:200]}...\n\n📚 Source: {friendly_name} (p.{page})"
 
 
 def optimize_search_query(question, retrieved_docs):
@@ -156,16 +302,21 @@ def optimize_search_query(question, retrieved_docs):
     Returns:
         str: Optimized search query
     """
+    # Only view the top 2 most relevant documents; their text is the cache key
+    contents = tuple(doc.page_content for doc in islice(retrieved_docs, 2))
+    return _optimize_search_query_cached(contents)
+
+
+@lru_cache(maxsize=128)
+def _optimize_search_query_cached(contents):
+    """
+    Build the search query from the top document texts (cached: repeat retrievals skip the scan)
+    """
     # Extract key concepts from RAG documentation
     rag_keywords = set()
-    for doc in retrieved_docs[:2]:  # Only view the top 2 most relevant documents
-        content = doc.page_content.lower()
-        # Extract key biological/conservation-related vocabulary
-        bio_keywords = ['seabird', 'petrel', 'bird', 'endemic', 'madeira', 'conservation', 
-                        'endangered', 'breeding', 'nesting', 'habitat', 'species', 'population']
-        for keyword in bio_keywords:
-            if keyword in content:
-                rag_keywords.add(keyword)
+    for content in contents:
+        # Extract key biological/conservation-related vocabulary in one pass
+        rag_keywords |= {m.lower() for m in _BIO_RE.findall(content)}
     
     # Build Precise Search Queries
     base_query = "Zino's Petrel"
@@ -191,50 +342,28 @@ def filter_search_results(results, question):
     Intelligently filter search results to exclude irrelevant content
     
     Args:
-        results: Raw list of search results
+        results: Raw search results (any iterable; consumed lazily)
         question: User query
     
-    Returns:
-        list: Filtered list of relevant results
+    Yields:
+        tuple: (title, body, href) of each relevant result, in their original order
     """
-    filtered = []
-    
-    # Related Keywords (Biology/Conservation)
-    relevant_keywords = [
-        'petrel', 'bird', 'seabird', 'species', 'madeira', 'conservation', 
-        'endangered', 'breeding', 'habitat', 'ornithology', 'wildlife',
-        'pterodroma', 'freira', 'endemic', 'biodiversity'
-    ]
-    
-    # Irrelevant Keywords (Technology/Programming Related)
-    irrelevant_keywords = [
-        'framework', 'programming', 'code', 'software', 'api', 'rust',
-        '编程', '框架', '开发', '代码', 'github', 'npm', 'cargo'
-    ]
-    
     for result in results:
-        title = result.get('title', '').lower()
-        body = result.get('body', '').lower()
+        # Read each field once; the same values are reused for display
+        title, body, href = _RESULT_FIELDS(_RESULT_DEFAULTS | result)
         combined = title + ' ' + body
+        if ahocorasick is not None:
+            combined = combined.lower()
         
         # Check if it contains irrelevant keywords
-        has_irrelevant = any(keyword in combined for keyword in irrelevant_keywords)
-        if has_irrelevant:
-            print(f"[Fact-Check] Filter out irrelevant results: {result.get('title', 'Unknown')[:50]}...")
+        if _contains_keyword(combined, _IRRELEVANT_AC, _IRRELEVANT_RE):
+            print(f"[Fact-Check] Filter out irrelevant results: {title[:50]}...")
             continue
         
         # Check if it contains relevant keywords
-        has_relevant = any(keyword in combined for keyword in relevant_keywords)
-        if has_relevant:
-            filtered.append(result)
-        else:
-            # Additional check: If the title explicitly includes the name of a key species, retain it as well.
-            title_lower = title.lower()
-            if any(name in title_lower for name in ['Zinos Petrel', 'madeira Petrel']):
-                filtered.append(result)
-    
-    
-    return filtered
+        # (Species names such as "Zino's Petrel" are covered by 'petrel'/'madeira')
+        if _contains_keyword(combined, _RELEVANT_AC, _RELEVANT_RE):
+            yield title, body, href
 
 
 def web_search_supplement(question, retrieved_docs=None, language="English"):
@@ -251,9 +380,7 @@ def web_search_supplement(question, retrieved_docs=None, language="English"):
         str: Web search result summary (if enabled)
     """
     # Check if network search is enabled
-    use_web_search = os.getenv("USE_WEB_SEARCH", "false").lower() == "true"
-    
-    if not use_web_search:
+    if not config.USE_WEB_SEARCH:
         return None
     
     # Optimizing Search Queries (Based on RAG Context)
@@ -264,7 +391,7 @@ def web_search_supplement(question, retrieved_docs=None, language="English"):
         optimized_query = f"Zino's Petrel {question} bird species"
     
     # Get Search Provider (Default: DuckDuckGo)
-    provider = os.getenv("WEB_SEARCH_PROVIDER", "duckduckgo").lower()
+    provider = config.WEB_SEARCH_PROVIDER.lower()
     
     # Option 1: DuckDuckGo (Completely free, no API key required)
     results = []  # Initialize the results variable
@@ -276,14 +403,14 @@ def web_search_supplement(question, retrieved_docs=None, language="English"):
             # Use the new API (no context manager required)
             ddgs = DDGS()
             # New API: The parameter name is query instead of keywords.
-            raw_results = list(ddgs.text(
+            raw_results = ddgs.text(
                 query=optimized_query,
                 max_results=5  # Get more results and filter them later.
-            ))
+            )
             
-            # Smart Filtered Results
-            results = filter_search_results(raw_results, question)
-            print(f"[Fact-Check] raw results: {len(raw_results)} → After filtering: {len(results)}")
+            # Smart Filtered Results: stop filtering once the top 2 relevant results are found
+            results = list(islice(filter_search_results(raw_results, question), 2))
+            print(f"[Fact-Check] After filtering: {len(results)}")
             
             if results:
                 if language == "Portuguese":
@@ -292,12 +419,8 @@ def web_search_supplement(question, retrieved_docs=None, language="English"):
                     summary = "🌐 **Internet Information:**\n\n"
                 
                 # Show only the top 2 most relevant results
-                for i, result in enumerate(results[:2], 1):
-                    title = result.get('title', 'Unknown')
-                    body = result.get('body', '')[:150]
-                    url = result.get('href', '')
-                    
-                    summary += f"{i}. **{title}**\n   {body}...\n   🔗 {url}\n\n"
+                for i, (title, body, url) in enumerate(results, 1):
+                    summary += f"{i}. **{title}**\n   {body[:150]}...\n   🔗 {url}\n\n"
                 
                 return summary.strip()
         
@@ -311,7 +434,7 @@ def web_search_supplement(question, retrieved_docs=None, language="English"):
     # If DuckDuckGo fails or the provider is set to tavily, try Tavily
     if provider == "tavily" or (provider == "duckduckgo" and len(results) == 0):
         try:
-            tavily_key = os.getenv("TAVILY_API_KEY")
+            tavily_key = config.TAVILY_API_KEY
             if tavily_key and tavily_key != "tvly-your-api-key":
                 from tavily import TavilyClient
                 
@@ -323,14 +446,14 @@ def web_search_supplement(question, retrieved_docs=None, language="English"):
                 )
                 
                 if response and 'results' in response:
-                    results = response['results'][:2]
+                    results = response['results']
                     
                     if language == "Portuguese":
                         summary = "🌐 **Informação da Internet:**\n\n"
                     else:
                         summary = "🌐 **Internet Information:**\n\n"
                     
-                    for i, result in enumerate(results, 1):
+                    for i, result in enumerate(islice(results, 2), 1):
                         title = result.get('title', 'Unknown')
                         content = result.get('content', '')[:150]
                         url = result.get('url', '')
@@ -357,29 +480,36 @@ def generate_fact_check_content(question, retrieved_docs, ai_answer, language="E
         ai_answer: AI response
         language: Language
     
-    Returns:
-        str: Fact-check content in HTML format
+    Yields:
+        str: Fact-check content chunks in Markdown format (header, summary, web results)
     """
-    # 1. Generate a knowledge base summary
-    kb_summary = summarize_fact_check(question, retrieved_docs, ai_answer, language)
-    
-    # 2. Optional: Intelligent Network Search Supplement (Passing RAG documents to optimize search queries)
-    web_summary = web_search_supplement(
-        question=question, 
-        retrieved_docs=retrieved_docs,  # Passing RAG Context to Optimize Search
-        language=language
-    )
-    
-    # 3. Combined Content
-    if language == "Portuguese":
-        header = "📋 **Verificação de Factos Baseada em Conhecimento Científico**\n\n"
-    else:
-        header = "📋 **Fact-Check Based on Scientific Knowledge**\n\n"
-    
-    content = header + kb_summary
+    # Both phases are network-bound and independent: start the web search in the
+    # background so its latency overlaps the summary stream instead of adding to it
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fact-check-search")
+    try:
+        # Optional: Intelligent Network Search Supplement (Passing RAG documents to optimize search queries)
+        web_future = executor.submit(
+            web_search_supplement,
+            question=question, 
+            retrieved_docs=retrieved_docs,  # Passing RAG Context to Optimize Search
+            language=language
+        )
+        
+        # 1. Header first, so something is rendered straight away
+        if language == "Portuguese":
+            yield "📋 **Verificação de Factos Baseada em Conhecimento Científico**\n\n"
+        else:
+            yield "📋 **Fact-Check Based on Scientific Knowledge**\n\n"
+        
+        # 2. Stream the knowledge base summary
+        yield from summarize_fact_check(question, retrieved_docs, ai_answer, language)
+        
+        # 3. Append the web results once the search has finished
+        web_summary = web_future.result()
+    finally:
+        # Never block here: if the stream is abandoned (Streamlit rerun, consumer error),
+        # GeneratorExit must not wait for a web search nobody will read
+        executor.shutdown(wait=False, cancel_futures=True)
     
     if web_summary:
-        content += f"\n\n---\n\n{web_summary}"
-    
-    return content
-
+        yield f"\n\n---\n\n{web_summary}"
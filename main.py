@@ -6,6 +6,7 @@ from gtts import gTTS
 from pydub import AudioSegment
 import re
 import base64
+import itertools
 import subprocess
 import speech_recognition as sr
 import streamlit as st
@@ -31,7 +32,6 @@ else:
 
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-import streamlit.components.v1 as components
 from st_supabase_connection import SupabaseConnection, execute_query
 import hashlib
 
@@ -251,8 +251,8 @@ def speak_text(text, loading_placeholder=None):
             loading_placeholder.empty()
         
         if success:
-            # Display Audio Player
-            components.html(result, height=0)
+            # Display Audio Player (raw mp3 bytes, no base64 data URI)
+            st.audio(result, format="audio/mp3", autoplay=True)
             print(f"[TTS] ✅ Audio generated using {method} for {current_language}")
         else:
             # TTS failure
@@ -272,8 +272,9 @@ def cleanup_audio_files():
     """Clean up temporary audio files"""
     tts_cleanup()
 
+@st.cache_data(show_spinner=False)
 def get_base64(file_path):
-    import base64
+    """Base64 of an image file for inline <img> data URIs (encoded once, cached across reruns)"""
     with open(file_path, "rb") as f:
         data = f.read()
     return base64.b64encode(data).decode()
@@ -498,11 +499,12 @@ def semantic_match(user_input, question_key, reward_details):
     response = semantic_model.invoke(prompt)
     return response.strip().lower() == 'yes'
 
+# Container keys only need to be unique within one script run (Streamlit re-executes this module on every rerun)
+_CONTAINER_SEQ = itertools.count()
+
 def chat_message(name):
-    if name == "assistant":
-        return st.container(key=f"{name}-{uuid.uuid4()}").chat_message(name=name, avatar="zino.png", width="content")
-    else:
-        return st.container(key=f"{name}-{uuid.uuid4()}").chat_message(name=name, avatar=":material/face:", width="content")
+    avatar = "zino.png" if name == "assistant" else ":material/face:"
+    return st.container(key=f"{name}-{next(_CONTAINER_SEQ)}").chat_message(name=name, avatar=avatar, width="content")
 
 # Language texts
 language_texts = {
@@ -644,8 +646,8 @@ def main():
         st.session_state.newly_awarded_sticker = False
     if "gift_shown" not in st.session_state:
         st.session_state.gift_shown = False
-    if "current_audio_html" not in st.session_state:
-        st.session_state.current_audio_html = None
+    if "current_audio" not in st.session_state:
+        st.session_state.current_audio = None
         
     st.set_page_config(layout="wide")
 
@@ -961,8 +963,7 @@ def main():
     user_input = None
 
     with left_col:
-        with open("zino.png", "rb") as img_file:
-            img_base64 = base64.b64encode(img_file.read()).decode("utf-8")
+        img_base64 = get_base64("zino.png")
 
         st.markdown(f"""
             <div style="display: flex; align-items: center; margin: 0; padding: 0;">
@@ -1001,14 +1002,13 @@ def main():
                         st.markdown(message["content"])
     
         # Display persistent audio player if available
-        if st.session_state.current_audio_html:
-            components.html(st.session_state.current_audio_html, height=60)
+        if st.session_state.current_audio:
+            st.audio(st.session_state.current_audio, format="audio/mp3", autoplay=True)
     
     # Gift section (render in left column context)
         @st.dialog("🎁 Your Gift", width=680)
         def gift_dialog():
-            with open("gift.png", "rb") as f:
-                gift_img_base64 = base64.b64encode(f.read()).decode()
+            gift_img_base64 = get_base64("gift.png")
             st.markdown(
                 f"""
                 <div class="petrel-response gift-box">
@@ -1072,7 +1072,7 @@ def main():
                 st.session_state.last_analysis = {}
                 st.session_state.newly_awarded_sticker = False
                 st.session_state.gift_shown = False
-                st.session_state.current_audio_html = None
+                st.session_state.current_audio = None
                 st.session_state.fact_check_cache = {}
                 if "session_id" in st.session_state:
                     del st.session_state["session_id"]
@@ -1111,7 +1111,7 @@ def main():
             st.markdown(
                 f"""
                 <div class="sticker-reward">
-                    <img src="data:image/png;base64,{base64.b64encode(open(most_recent["image"], "rb").read()).decode()}">
+                    <img src="data:image/png;base64,{get_base64(most_recent["image"])}">
                     <div class="sticker-caption">{current_caption}</div>
                 </div>
                 """,
@@ -1138,35 +1138,18 @@ def main():
             </div>
         """, unsafe_allow_html=True)
         
-        # Generate fact-check content only once and cache it
-        if "most_relevant_texts" in st.session_state and "last_question" in st.session_state and "last_answer" in st.session_state:
-            # Create a unique key for this Q&A pair
-            fact_check_key = f"{st.session_state.last_question}_{st.session_state.last_answer}"
-            
-            # Only generate if not already cached for this Q&A
-            if "fact_check_cache" not in st.session_state:
-                st.session_state.fact_check_cache = {}
-            
-            if fact_check_key not in st.session_state.fact_check_cache: 
-                if len(st.session_state.most_relevant_texts) > 0:
-                    try:
-                        fact_check_summary = generate_fact_check_content(
-                            question=st.session_state.last_question,
-                            retrieved_docs=st.session_state.most_relevant_texts,
-                            ai_answer=st.session_state.last_answer,
-                            language=st.session_state.language
-                        )
-                        st.session_state.fact_check_cache[fact_check_key] = fact_check_summary
-                    except Exception as e:
-                        print(f"[Fact-Check] Abstract generation failed: {str(e)}")
-                        st.session_state.fact_check_cache[fact_check_key] = st.session_state.most_relevant_texts[0].page_content[:300] + "..."
+        # Fact-check content is generated once per Q&A pair and cached
+        if "fact_check_cache" not in st.session_state:
+            st.session_state.fact_check_cache = {}
         
-        # Display the expander with cached content
+        # Display the expander, streaming the content on first render and reusing the cache afterwards
         with st.expander(texts['fact_check'], expanded=False):
             if "most_relevant_texts" in st.session_state and "last_question" in st.session_state and "last_answer" in st.session_state:
+                # Create a unique key for this Q&A pair
                 fact_check_key = f"{st.session_state.last_question}_{st.session_state.last_answer}"
+                is_cached = fact_check_key in st.session_state.fact_check_cache
                 
-                if fact_check_key in st.session_state.fact_check_cache:
+                if is_cached or len(st.session_state.most_relevant_texts) > 0:
                     st.markdown("""
                         <style>
                         .fact-check-box {
@@ -1187,7 +1170,29 @@ def main():
                         </style>
                     """, unsafe_allow_html=True)
                     
-                    st.markdown(st.session_state.fact_check_cache[fact_check_key])
+                    if is_cached:
+                        st.markdown(st.session_state.fact_check_cache[fact_check_key])
+                    else:
+                        def fact_check_stream():
+                            # Errors are handled inside the stream: st.write_stream has already rendered
+                            # whatever was yielded, so the excerpt is only shown if nothing was
+                            streamed = False
+                            try:
+                                for chunk in generate_fact_check_content(
+                                    question=st.session_state.last_question,
+                                    retrieved_docs=st.session_state.most_relevant_texts,
+                                    ai_answer=st.session_state.last_answer,
+                                    language=st.session_state.language
+                                ):
+                                    streamed = True
+                                    yield chunk
+                            except Exception as e:
+                                print(f"[Fact-Check] Abstract generation failed: {str(e)}")
+                                if not streamed:
+                                    yield st.session_state.most_relevant_texts[0].page_content[:300] + "..."
+                        
+                        fact_check_summary = st.write_stream(fact_check_stream())
+                        st.session_state.fact_check_cache[fact_check_key] = fact_check_summary
                     st.markdown('</div>', unsafe_allow_html=True)
                 else:
                     st.info("Generating fact-check...")
@@ -1303,14 +1308,14 @@ def main():
                     )
                     
                     if success:
-                        # Store audio HTML in session state for persistent display
-                        st.session_state.current_audio_html = result
+                        # Store audio bytes in session state for persistent display
+                        st.session_state.current_audio = result
                         print(f"[TTS] ✅ Audio generated using {method} for {current_language}")
                     else:
-                        st.session_state.current_audio_html = None
+                        st.session_state.current_audio = None
                         print(f"[TTS] ❌ {result}")
                 except Exception as tts_error:
-                    st.session_state.current_audio_html = None
+                    st.session_state.current_audio = None
                     print(f"[TTS] ❌ Exception: {tts_error}")
                     
                 st.session_state.audio_played = True
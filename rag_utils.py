@@ -3,10 +3,97 @@ RAG Retrieval Optimization Tool
 Includes optimization strategies such as vector cache, dynamic k-value adjustment, and relevance filtering.
 """
 
+import asyncio
+import contextvars
+import hashlib
 import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-from langchain_community.embeddings import DashScopeEmbeddings
-from langchain_chroma import Chroma
+
+# Runs of non-whitespace, i.e. the words str.split() would return
+_WORD_RE = re.compile(r"\S+")
+
+# Number of recent retrievals kept per OptimizedRAG instance
+QUERY_CACHE_SIZE = 32
+
+# Query embeddings kept in memory per instance, and persisted on disk across runs
+EMBEDDING_CACHE_SIZE = 4096
+EMBEDDING_CACHE_DIR = ".emb_cache"
+
+try:
+    import diskcache  # Optional: pip install diskcache
+except ImportError:
+    diskcache = None
+
+# Optional: JIT-compiled cosine similarity for MMR (falls back to LangChain's NumPy version)
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # Serial on purpose: retrieve() runs from several threads at once, and numba's default
+    # threading layer aborts when parallel kernels are entered concurrently (MMR matrices are tiny anyway)
+    @njit(fastmath=True, cache=True)
+    def _cosine_sim_kernel(A, B):
+        out = np.zeros((A.shape[0], B.shape[0]))
+        nb = np.zeros(B.shape[0])
+        for j in range(B.shape[0]):
+            s = 0.0
+            for d in range(B.shape[1]):
+                s += B[j, d] * B[j, d]
+            nb[j] = np.sqrt(s)
+        for i in range(A.shape[0]):
+            na = 0.0
+            for d in range(A.shape[1]):
+                na += A[i, d] * A[i, d]
+            na = np.sqrt(na)
+            for j in range(B.shape[0]):
+                dot = 0.0
+                for d in range(A.shape[1]):
+                    dot += A[i, d] * B[j, d]
+                if na > 0.0 and nb[j] > 0.0:
+                    out[i, j] = dot / (na * nb[j])  # Zero vectors score 0, as in LangChain
+        return out
+
+    def cosine_similarity(X, Y):
+        """
+        Row-wise cosine similarity between two matrices (drop-in for langchain_chroma's version)
+        
+        Args:
+            X: Matrix (or list of vectors) of shape (n, dim)
+            Y: Matrix (or list of vectors) of shape (m, dim)
+        
+        Returns:
+            np.ndarray: Similarity matrix of shape (n, m)
+        """
+        if len(X) == 0 or len(Y) == 0:
+            return np.array([])
+        # Embeddings are stored as float32; the kernel still accumulates in float64
+        X = np.asarray(X, dtype=np.float32)
+        Y = np.asarray(Y, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if Y.ndim == 1:
+            Y = Y.reshape(1, -1)
+        if X.shape[1] != Y.shape[1]:
+            raise ValueError(
+                f"Number of columns in X and Y must be the same. X has shape {X.shape} "
+                f"and Y has shape {Y.shape}."
+            )
+        return _cosine_sim_kernel(X, Y)
+else:
+    cosine_similarity = None
+
+@lru_cache(maxsize=4)
+def _get_embeddings(model, dashscope_api_key):
+    """Return the shared DashScope embedding client for a model/key pair (created on first use)"""
+    from langchain_community.embeddings import DashScopeEmbeddings
+    return DashScopeEmbeddings(model=model, dashscope_api_key=dashscope_api_key)
 
 class OptimizedRAG:
     """Optimized RAG Retriever"""
@@ -15,22 +102,40 @@ class OptimizedRAG:
         self.persist_directory = persist_directory
         self.dashscope_api_key = dashscope_api_key
         self._vectordb = None
+        self._vectordb_lock = threading.Lock()
+        # Bounded LRU cache of recent retrievals: (query, parameters) -> documents
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self.embedding_model = os.getenv("QWEN_EMBEDDING_MODEL", "text-embedding-v3")
+        # Query embeddings are deterministic: memoize in memory, backed by a disk cache if available
+        self._embedding_disk_cache = None
+        self._embed_query_cached = lru_cache(maxsize=EMBEDDING_CACHE_SIZE)(self._embed_query)
         
     @property
     def vectordb(self):
         """Lazy-loading and caching vector databases"""
         if self._vectordb is None:
-            print(f"[RAG] Load the vector database: {self.persist_directory}")
-            embeddings = DashScopeEmbeddings(
-                model=os.getenv("QWEN_EMBEDDING_MODEL", "text-embedding-v3"),
-                dashscope_api_key=self.dashscope_api_key
-            )
-            self._vectordb = Chroma(
-                embedding_function=embeddings,
-                persist_directory=self.persist_directory,
-                collection_name="zinos_petrel_knowledge"  # Maintain consistency with vectorized scripts
-            )
-            print(f"[RAG] ✅ The vector database has been loaded.")
+            with self._vectordb_lock:
+                # Re-check: another thread may have loaded it while we waited
+                if self._vectordb is None:
+                    # Heavy imports are deferred until the database is actually needed
+                    from langchain_chroma import Chroma
+                    if cosine_similarity is not None:
+                        # MMR looks the similarity function up at module level on every call
+                        import langchain_chroma.vectorstores as chroma_vectorstores
+                        chroma_vectorstores.cosine_similarity = cosine_similarity
+
+                    print(f"[RAG] Load the vector database: {self.persist_directory}")
+                    if diskcache is not None:
+                        self._embedding_disk_cache = diskcache.Cache(EMBEDDING_CACHE_DIR)
+                    # One embedding client is shared by every instance using the same model and key
+                    embeddings = _get_embeddings(self.embedding_model, self.dashscope_api_key)
+                    self._vectordb = Chroma(
+                        embedding_function=embeddings,
+                        persist_directory=self.persist_directory,
+                        collection_name="zinos_petrel_knowledge"  # Maintain consistency with vectorized scripts
+                    )
+                    print(f"[RAG] ✅ The vector database has been loaded.")
         return self._vectordb
     
     def retrieve(self, query, k=None, fetch_k=None, lambda_mult=0.7, 
@@ -56,26 +161,150 @@ class OptimizedRAG:
         if fetch_k is None:
             fetch_k = k * 3  # The candidate pool is three times the number of returns.
         
-        print(f"[RAG] Search Parameters: k={k}, fetch_k={fetch_k}, lambda_mult={lambda_mult}")
+        # Identical queries (e.g. a repeated question) are served from the cache
+        cache_key = (query, k, fetch_k, lambda_mult, relevance_threshold)
+        with self._query_cache_lock:
+            cached = self._query_cache.get(cache_key)
+            if cached is not None:
+                self._query_cache.move_to_end(cache_key)
+        if cached is not None:
+            print(f"[RAG] Cache hit: k={k}, fetch_k={fetch_k}, lambda_mult={lambda_mult}")
+            return list(cached)
         
-        # Retrieval Using MMR (Maximum Marginal Relevance)
-        docs = self.vectordb.max_marginal_relevance_search(
-            query,
+        docs = self._search(query, k, fetch_k, lambda_mult, relevance_threshold)
+        
+        with self._query_cache_lock:
+            self._query_cache[cache_key] = tuple(docs)
+            self._query_cache.move_to_end(cache_key)
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)  # Evict the least recently used entry
+        
+        return docs
+    
+    async def aretrieve(self, query, k=None, fetch_k=None, lambda_mult=0.7,
+                        relevance_threshold=None):
+        """
+        Async variant of retrieve() (runs the blocking retrieval in a worker thread)
+        """
+        return await asyncio.to_thread(
+            self.retrieve, query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult,
+            relevance_threshold=relevance_threshold
+        )
+    
+    def retrieve_batch(self, queries, k=None, fetch_k=None, lambda_mult=0.7,
+                       relevance_threshold=None, max_workers=8):
+        """
+        Retrieve documents for several queries concurrently
+        
+        Each query is embedded as a query (not a document), so results match retrieve();
+        the embedding round-trips overlap instead of running one after another.
+        
+        Args:
+            queries: Iterable of search texts
+            k, fetch_k, lambda_mult, relevance_threshold: Same as retrieve()
+            max_workers: Maximum number of requests in flight
+        
+        Returns:
+            list: One retrieved document list per query, in input order
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+        
+        # Open the vector database once before fanning out
+        self.vectordb
+        
+        def retrieve_one(query):
+            return self.retrieve(
+                query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult,
+                relevance_threshold=relevance_threshold
+            )
+        
+        # Each query runs in a copy of the caller's context (as asyncio.to_thread does), so context
+        # variables such as an output capture still apply inside the worker threads
+        contexts = [contextvars.copy_context() for _ in queries]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as executor:
+            return list(executor.map(lambda ctx, query: ctx.run(retrieve_one, query), contexts, queries))
+    
+    def _mmr_by_vector(self, query_embedding, k, fetch_k, lambda_mult):
+        """
+        MMR over one raw collection query; only the k selected candidates become Documents
+        
+        Equivalent to Chroma.max_marginal_relevance_search_by_vector, which wraps
+        all fetch_k candidates into Documents before selecting k of them; like it,
+        the selected documents are returned in distance order, not in MMR pick order.
+        """
+        import numpy as np
+        from langchain_chroma.vectorstores import maximal_marginal_relevance
+        from langchain_core.documents import Document
+        
+        results = self.vectordb._collection.query(
+            query_embeddings=[query_embedding],
+            n_results=fetch_k,
+            include=["embeddings", "documents", "metadatas"]
+        )
+        embeddings = results["embeddings"][0]
+        if len(embeddings) == 0:
+            return []
+        
+        selected = maximal_marginal_relevance(
+            np.array(query_embedding, dtype=np.float32),
+            embeddings,
             k=k,
-            fetch_k=fetch_k,
             lambda_mult=lambda_mult
         )
+        documents = results["documents"][0]
+        metadatas = results["metadatas"][0]
+        return [
+            Document(page_content=documents[i], metadata=metadatas[i] or {})
+            for i in sorted(selected)
+        ]
+    
+    def _search(self, query, k, fetch_k, lambda_mult, relevance_threshold):
+        """
+        Run the actual vector store retrieval (MMR plus optional relevance filtering)
+        """
+        print(f"[RAG] Search Parameters: k={k}, fetch_k={fetch_k}, lambda_mult={lambda_mult}")
+        
+        # Embed the query once; the vector is reused for MMR and relevance scoring
+        query_embedding = self._embed_query_cached(query)
+        
+        # Retrieval Using MMR (Maximum Marginal Relevance)
+        docs = self._mmr_by_vector(query_embedding, k, fetch_k, lambda_mult)
         
         # Relevance Filtering (if a threshold is set)
         if relevance_threshold is not None:
             filtered_docs = self._filter_by_relevance(
-                query, docs, threshold=relevance_threshold
+                query_embedding, docs, threshold=relevance_threshold
             )
             print(f"[RAG] Relevance Filtering: {len(docs)} -> {len(filtered_docs)} document")
             return filtered_docs
         
         return docs
     
+    def _embed_query(self, query):
+        """
+        Embed a search text, reading and filling the on-disk embedding cache when available
+        
+        Args:
+            query: Search text
+        
+        Returns:
+            list: Query embedding vector
+        """
+        embeddings = self.vectordb.embeddings
+        disk_cache = self._embedding_disk_cache
+        if disk_cache is None:
+            return embeddings.embed_query(query)
+        
+        # Keyed by model as well, so switching embedding models never returns stale vectors
+        key = hashlib.sha256(f"{self.embedding_model}\0{query}".encode("utf-8")).hexdigest()
+        embedding = disk_cache.get(key)
+        if embedding is None:
+            embedding = embeddings.embed_query(query)
+            disk_cache.set(key, embedding)
+        return embedding
+    
     def _estimate_k(self, query):
         """
         Estimating k Value Based on Query Complexity
@@ -85,7 +314,8 @@ class OptimizedRAG:
         - Medium queries (20-50 words): k=3
         - Complex queries (>50 words): k=4
         """
-        word_count = len(query.split())
+        # Count words without building the list of substrings
+        word_count = sum(1 for _ in _WORD_RE.finditer(query))
         
         if word_count < 20:
             return 2
@@ -94,21 +324,21 @@ class OptimizedRAG:
         else:
             return 4
     
-    def _filter_by_relevance(self, query, docs, threshold=0.6):
+    def _filter_by_relevance(self, query_embedding, docs, threshold=0.6):
         """
         Filter documents based on relevance scores
         
         Args:
-            query: Search text
+            query_embedding: Embedding vector of the search text (already computed by retrieve)
             docs: Document list
             threshold: Relevance threshold (0-1)
         
         Returns:
             list: Filtered documents
         """
-        # Use similarity_search_with_score to obtain relevance scores
-        docs_with_scores = self.vectordb.similarity_search_with_score(
-            query, 
+        # Score by vector so the query is not sent to the embedding API a second time
+        docs_with_scores = self.vectordb.similarity_search_by_vector_with_relevance_scores(
+            query_embedding, 
             k=len(docs)
         )
         
@@ -134,6 +364,7 @@ class OptimizedRAG:
 
 # Global RAG Instance Caching (Preventing Repeated Loading)
 _rag_instances = {}
+_rag_lock = threading.Lock()
 
 def get_rag_instance(persist_directory, dashscope_api_key):
     """
@@ -146,10 +377,16 @@ def get_rag_instance(persist_directory, dashscope_api_key):
     Returns:
         OptimizedRAG: RAG instance
     """
-    if persist_directory not in _rag_instances:
-        _rag_instances[persist_directory] = OptimizedRAG(
-            persist_directory, 
-            dashscope_api_key
-        )
-    return _rag_instances[persist_directory]
+    instance = _rag_instances.get(persist_directory)
+    if instance is None:
+        with _rag_lock:
+            # Double-checked: only one thread constructs the instance
+            instance = _rag_instances.get(persist_directory)
+            if instance is None:
+                instance = OptimizedRAG(
+                    persist_directory, 
+                    dashscope_api_key
+                )
+                _rag_instances[persist_directory] = instance
+    return instance
 
@@ -6,26 +6,109 @@ Usage:
     python test_rag_quality.py
 """
 
+import asyncio
+import contextvars
+import io
 import os
+import sys
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dotenv import load_dotenv
 from rag_utils import get_rag_instance
+from user_tests_data import (
+    USER_TESTS, build_keyword_automaton, keyword_hit_matrix, lowercase_keywords, retrieve_concurrently
+)
 
 # Load Environment Variables
 load_dotenv()
 
+# Resolved once for the whole suite
+_API_KEY = os.getenv("DASHSCOPE_API_KEY")
+_RAG_CACHE = {}
+
+
+def _rag(persist_directory="db5_qwen"):
+    """Return the RAG instance for a vector store, creating it only on first use"""
+    rag = _RAG_CACHE.get(persist_directory)
+    if rag is None:
+        rag = _RAG_CACHE[persist_directory] = get_rag_instance(persist_directory, _API_KEY)
+    return rag
+
+# Report banners (built once)
+SEP = "=" * 60
+
+# Buffer that print() output is collected into for the current thread/task (None: real stdout)
+_output_buffer = contextvars.ContextVar("output_buffer", default=None)
+# sys.stdout is wrapped while at least one capture is active, and restored after the last one
+_capture_lock = threading.Lock()
+_capture_depth = 0
+_original_stdout = None
+
+
+class _ContextStdout:
+    """sys.stdout stand-in that sends writes to the current context's buffer, if one is set"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text):
+        buf = _output_buffer.get()
+        return (self._stream if buf is None else buf).write(text)
+    
+    def flush(self):
+        if _output_buffer.get() is None:
+            self._stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@contextmanager
+def capture_output():
+    """
+    Collect everything printed in the current context into a StringIO
+    
+    Unlike contextlib.redirect_stdout this only affects the current context, so concurrent
+    phases can each capture their own output. It follows the context into asyncio tasks,
+    asyncio.to_thread() and rag.retrieve_batch() workers; plain executor threads do not inherit it.
+    """
+    global _capture_depth, _original_stdout
+    with _capture_lock:
+        if _capture_depth == 0:
+            _original_stdout = sys.stdout
+            sys.stdout = _ContextStdout(sys.stdout)
+        _capture_depth += 1
+    buf = io.StringIO()
+    token = _output_buffer.set(buf)
+    try:
+        yield buf
+    finally:
+        _output_buffer.reset(token)
+        with _capture_lock:
+            _capture_depth -= 1
+            if _capture_depth == 0:
+                sys.stdout = _original_stdout
+
+
+def _run_captured(phase):
+    """Run one test phase with its output captured; returns (output, exception or None)"""
+    with capture_output() as buf:
+        try:
+            phase()
+        except Exception as e:
+            return buf.getvalue(), e
+    return buf.getvalue(), None
+
 def test_vectordb_stats():
     """Test Vector Library Statistics"""
-    print("=" * 60)
+    print(SEP)
     print("📊 Vector Library Statistics")
-    print("=" * 60)
-    
-    api_key = os.getenv("DASHSCOPE_API_KEY")
-    if not api_key:
-        print("❌ Error: Not foundDASHSCOPE_API_KEY")
-        return
+    print(SEP)
     
-    rag = get_rag_instance("db5_qwen", api_key)
+    rag = _rag("db5_qwen")
     stats = rag.get_stats()
     
     print(f"\n✅ Vector Library Path: {stats['persist_directory']}")
@@ -35,12 +118,11 @@ def test_vectordb_stats():
 
 def test_retrieval_quality(lambda_mult=0.3):
     """Testing Retrieval Quality - Basic Scenario"""
-    print("=" * 60)
+    print(SEP)
     print(f"🧪 Search Quality Testing - Basic Scenarios (lambda_mult={lambda_mult})")
-    print("=" * 60)
+    print(SEP)
     
-    api_key = os.getenv("DASHSCOPE_API_KEY")
-    rag = get_rag_instance("db5_qwen", api_key)
+    rag = _rag("db5_qwen")
     
     # Test Query List
     test_queries = [
@@ -61,25 +143,37 @@ def test_retrieval_quality(lambda_mult=0.3):
         }
     ]
     
-    for i, test in enumerate(test_queries, 1):
-        print(f"\n{'=' * 60}")
+    for test in test_queries:
+        test['keywords_lc'] = lowercase_keywords(test['expected_keywords'])
+    automaton = build_keyword_automaton(kw for test in test_queries for kw in test['keywords_lc'])
+    
+    # Retrieve all queries in one batch (time is amortized per query);
+    # the retriever's own log lines are held back until the timer has stopped
+    sys.stdout.flush()
+    with capture_output() as rag_log:
+        start_time = time.perf_counter_ns()
+        all_docs = rag.retrieve_batch([test['query'] for test in test_queries], lambda_mult=lambda_mult)
+        elapsed_time = (time.perf_counter_ns() - start_time) / 1e9 / len(test_queries)
+    sys.stdout.write(rag_log.getvalue())
+    
+    # Keyword coverage for all queries
+    hits, coverages = keyword_hit_matrix(
+        [[doc.page_content.lower() for doc in docs] for docs in all_docs], test_queries, automaton
+    )
+    
+    for i, (test, docs) in enumerate(zip(test_queries, all_docs), 1):
+        print(f"\n{SEP}")
         print(f"Test {i}: {test['complexity'].upper()} 查询")
-        print(f"{'=' * 60}")
+        print(SEP)
         print(f"📝 Qurey: '{test['query']}'")
         print(f"🎯 Expected Key Words: {', '.join(test['expected_keywords'])}")
         
-        # Time Count
-        start_time = time.time()
-        docs = rag.retrieve(test['query'], lambda_mult=lambda_mult)
-        elapsed_time = time.time() - start_time
-        
-        print(f"\n⏱️  Search time: {elapsed_time:.3f} Second")
+        print(f"\n⏱️  Search time: {elapsed_time:.3f} Second (batch average)")
         print(f"📄 Number of documents returned: {len(docs)}")
         
         # Check keyword coverage
-        all_content = " ".join([doc.page_content.lower() for doc in docs])
-        found_keywords = [kw for kw in test['expected_keywords'] if kw.lower() in all_content]
-        coverage = len(found_keywords) / len(test['expected_keywords']) * 100
+        found_keywords = [kw for kw, hit in zip(test['expected_keywords'], hits[i - 1]) if hit]
+        coverage = coverages[i - 1]
         
         print(f"✅ Keyword Coverage Rate: {coverage:.1f}% ({len(found_keywords)}/{len(test['expected_keywords'])})")
         print(f"   Find: {', '.join(found_keywords) if found_keywords else '无'}")
@@ -101,150 +195,81 @@ def test_retrieval_quality(lambda_mult=0.3):
         else:
             print(f"\n❌ Quality Assessment: Needs improvement (coverage <50%)")
 
-def test_user_scenarios(lambda_mult=0.3):
+async def test_user_scenarios(lambda_mult=0.3):
     """Testing user scenarios in real-world conditions"""
-    print("\n" + "=" * 60)
+    print("\n" + SEP)
     print(f"👥 User Scenario Testing  (lambda_mult={lambda_mult})")
-    print("=" * 60)
+    print(SEP)
     print("Simulate real user conversations to evaluate the actual performance of RAG systems.")
     print()
     
-    api_key = os.getenv("DASHSCOPE_API_KEY")
-    rag = get_rag_instance("db5_qwen", api_key)
+    rag = _rag("db5_qwen")
     
-    # User Actual Test Issues
-    user_tests = [
-        {
-            "id": 1,
-            "query": "Hi, how are you doing today?",
-            "category": "Greetings",
-            "expected_keywords": ["petrel", "bird", "fine", "good"],
-            "expected_sticker": None,
-            "expected_score_change": "+1 (empathy)"
-        },
-        {
-            "id": 2,
-            "query": "Where do you usually have your nesting areas?",
-            "category": "Habitat",
-            "expected_keywords": ["nest", "Madeira", "mountains", "cliffs", "caves"],
-            "expected_sticker": "🏡 Home",
-            "expected_score_change": "+1 (knowledge)"
-        },
-        {
-            "id": 3,
-            "query": "How long do you live approximately?",
-            "category": "Lifespan",
-            "expected_keywords": ["years", "lifespan", "live", "age"],
-            "expected_sticker": None,
-            "expected_score_change": "+1 (deep_interaction)"
-        },
-        {
-            "id": 4,
-            "query": "Why do you need to abort sometimes to protect your species, that's a very sad thing and I don't quite understand how does it help you",
-            "category": "Protection Strategy",
-            "expected_keywords": ["conservation", "protection", "breeding", "survival", "predators"],
-            "expected_sticker": "🌱 Helper (Maybe)",
-            "expected_score_change": "+1 (conservation_action/empathy)"
-        },
-        {
-            "id": 5,
-            "query": "How long do you sleep?",
-            "category": "Daily Habits",
-            "expected_keywords": ["sleep", "rest", "night", "day", "active"],
-            "expected_sticker": "🌙 Routine (Maybe)",
-            "expected_score_change": "+1 (knowledge)"
-        },
-        {
-            "id": 6,
-            "query": "How do I find you?",
-            "category": "Observation Guide",
-            "expected_keywords": ["Madeira", "mountains", "sea", "observation", "location"],
-            "expected_sticker": "🏡 Home (If not triggered)",
-            "expected_score_change": "+1 (personal_engagement)"
-        },
-        {
-            "id": 7,
-            "query": "Do you have a friend?",
-            "category": "Social",
-            "expected_keywords": ["mate", "colony", "pair", "social", "alone"],
-            "expected_sticker": None,
-            "expected_score_change": "+1 (personal_engagement)"
-        },
-        {
-            "id": 8,
-            "query": "What do you eat for food and how do you catch it?",
-            "category": "Diet",
-            "expected_keywords": ["fish", "squid", "food", "catch", "hunt", "sea"],
-            "expected_sticker": "🍽️ Food",
-            "expected_score_change": "+1 (knowledge)"
-        },
-        {
-            "id": 9,
-            "query": "How can I help you and your species thrive?",
-            "category": "Protection Action",
-            "expected_keywords": ["help", "protect", "conservation", "support", "habitat"],
-            "expected_sticker": "🌱 Helper",
-            "expected_score_change": "+1 (conservation_action)"
-        }
-    ]
+    user_tests = USER_TESTS
     
-    total_coverage = 0
     successful_tests = 0
     
-    for test in user_tests:
-        print(f"\n{'=' * 60}")
-        print(f"Test {test['id']}: {test['category']} - {test['expected_sticker'] or 'None Stickers'}")
-        print(f"{'=' * 60}")
-        print(f"📝 Question: '{test['query']}'")
-        print(f"🎯 Expected Keywords: {', '.join(test['expected_keywords'])}")
-        print(f"🎁 Expected Stickers: {test['expected_sticker'] or 'None'}")
-        print(f"❤️ Expected Score Change: {test['expected_score_change']}")
-        
-        # Time Count
-        start_time = time.time()
-        docs = rag.retrieve(test['query'], lambda_mult=lambda_mult)
-        elapsed_time = time.time() - start_time
+    automaton = build_keyword_automaton(kw for test in user_tests for kw in test['keywords_lc'])
+    
+    # Retrieve all questions concurrently, each one timed on its own
+    results = await retrieve_concurrently(rag, [test['query'] for test in user_tests], lambda_mult)
+    
+    # Keyword coverage for all questions
+    hits, coverages = keyword_hit_matrix(
+        [[doc.page_content.lower() for doc in docs] for docs, _ in results], user_tests, automaton
+    )
+    
+    for i, (test, (docs, elapsed_time)) in enumerate(zip(user_tests, results)):
+        # Format the whole report for this question, then write it out at once
+        buf = io.StringIO()
+        print(f"\n{SEP}", file=buf)
+        print(f"Test {test['id']}: {test['category']} - {test['expected_sticker'] or 'None Stickers'}", file=buf)
+        print(SEP, file=buf)
+        print(f"📝 Question: '{test['query']}'", file=buf)
+        print(f"🎯 Expected Keywords: {', '.join(test['expected_keywords'])}", file=buf)
+        print(f"🎁 Expected Stickers: {test['expected_sticker'] or 'None'}", file=buf)
+        print(f"❤️ Expected Score Change: {test['expected_score_change']}", file=buf)
         
-        print(f"\n⏱️  Search time: {elapsed_time:.3f} Second")
-        print(f"📄 Number of documents returned: {len(docs)}")
+        print(f"\n⏱️  Search time: {elapsed_time:.3f} Second", file=buf)
+        print(f"📄 Number of documents returned: {len(docs)}", file=buf)
         
         # Check keyword coverage
-        all_content = " ".join([doc.page_content.lower() for doc in docs])
-        found_keywords = [kw for kw in test['expected_keywords'] if kw.lower() in all_content]
-        coverage = len(found_keywords) / len(test['expected_keywords']) * 100 if test['expected_keywords'] else 0
-        total_coverage += coverage
+        found_keywords = [kw for kw, hit in zip(test['expected_keywords'], hits[i]) if hit]
+        coverage = coverages[i]
         
-        print(f"✅ Keyword Coverage Rate: {coverage:.1f}% ({len(found_keywords)}/{len(test['expected_keywords'])})")
+        print(f"✅ Keyword Coverage Rate: {coverage:.1f}% ({len(found_keywords)}/{len(test['expected_keywords'])})", file=buf)
         if found_keywords:
-            print(f"   Find: {', '.join(found_keywords)}")
+            print(f"   Find: {', '.join(found_keywords)}", file=buf)
         else:
-            print(f"   Find: None")
+            print(f"   Find: None", file=buf)
         
         # Show document sources (display up to 2)
-        print(f"\n📚 Document Source:")
-        for i, doc in enumerate(docs[:2], 1):
+        print(f"\n📚 Document Source:", file=buf)
+        for rank, doc in enumerate(docs[:2], 1):
             source = doc.metadata.get('source_file', 'Unknown')
             page = doc.metadata.get('page', 'N/A')
             preview = doc.page_content[:80].replace('\n', ' ')
-            print(f"   {i}. {source} (Page {page})")
-            print(f"      Preview: {preview}...")
+            print(f"   {rank}. {source} (Page {page})", file=buf)
+            print(f"      Preview: {preview}...", file=buf)
         
         # Quality Assessment
         if coverage >= 60:
-            print(f"\n✅ Search Quality: Excellent (Coverage ≥60%)")
+            print(f"\n✅ Search Quality: Excellent (Coverage ≥60%)", file=buf)
             successful_tests += 1
         elif coverage >= 40:
-            print(f"\n⚠️  Search Quality: Good (Coverage ≥40%)")
+            print(f"\n⚠️  Search Quality: Good (Coverage ≥40%)", file=buf)
             successful_tests += 1
         else:
-            print(f"\n❌ Search Quality: Needs improvement (coverage <40%)")
+            print(f"\n❌ Search Quality: Needs improvement (coverage <40%)", file=buf)
+        
+        sys.stdout.write(buf.getvalue())
     
     # Summary
-    print(f"\n{'=' * 60}")
+    print(f"\n{SEP}")
     print(f"📊 Test Summary")
-    print(f"{'=' * 60}")
+    print(SEP)
     print(f"✅ Successful Test: {successful_tests}/{len(user_tests)} ({successful_tests/len(user_tests)*100:.1f}%)")
-    print(f"📈 Average Keyword Coverage Rate: {total_coverage/len(user_tests):.1f}%")
+    print(f"📈 Average Keyword Coverage Rate: {coverages.mean():.1f}%")
     
     if successful_tests >= 7:
         print(f"\n🎉 Overall Assessment: Excellent! The RAG system performed exceptionally well.")
@@ -255,27 +280,39 @@ def test_user_scenarios(lambda_mult=0.3):
 
 def test_performance():
     """Test performance (cache effect)"""
-    print("\n" + "=" * 60)
+    print("\n" + SEP)
     print("⚡ Performance Test (Cache Effect)")
-    print("=" * 60)
+    print(SEP)
     
-    api_key = os.getenv("DASHSCOPE_API_KEY")
-    test_query = "What is Zino's Petrel?"
+    # A query no other phase (or earlier run) has embedded: the in-memory and .emb_cache
+    # embedding caches are keyed by query text, so a repeated query would never be cold
+    run_tag = uuid.uuid4().hex[:8]
+    test_query = f"What is Zino's Petrel? ({run_tag})"
+    
+    # Open the index and warm the embedding client outside the timed window,
+    # so "cold" measures the first retrieval of the query rather than setup cost
+    rag = _rag("db5_qwen")
+    rag.retrieve(f"warmup ({run_tag})")
     
     # First query (cold start)
+    # Console output is kept out of the timed windows (the retriever's log is written afterwards)
     print(f"\n🔵 First Query (Cold Start)...")
-    start_time = time.time()
-    rag1 = get_rag_instance("db6_qwen", api_key)
-    docs1 = rag1.retrieve(test_query)
-    cold_time = time.time() - start_time
+    sys.stdout.flush()
+    with capture_output() as rag_log:
+        start_time = time.perf_counter_ns()
+        docs1 = rag.retrieve(test_query)
+        cold_time = (time.perf_counter_ns() - start_time) / 1e9
+    sys.stdout.write(rag_log.getvalue())
     print(f"   ⏱️  Time taken: {cold_time:.3f} seconds")
     
-    # Second query (cache hit)
+    # Second query (cache hit) on the same instance and index
     print(f"\n🟢 Second Query (Cache Hit)...")
-    start_time = time.time()
-    rag2 = get_rag_instance("db5_qwen", api_key)
-    docs2 = rag2.retrieve(test_query)
-    hot_time = time.time() - start_time
+    sys.stdout.flush()
+    with capture_output() as rag_log:
+        start_time = time.perf_counter_ns()
+        docs2 = rag.retrieve(test_query)
+        hot_time = (time.perf_counter_ns() - start_time) / 1e9
+    sys.stdout.write(rag_log.getvalue())
     print(f"   ⏱️  Time taken: {hot_time:.3f} seconds")
     
     # Performance improvement
@@ -286,26 +323,38 @@ def test_performance():
 
 def main():
     """Main function"""
-    print("\n" + "=" * 60)
+    if not _API_KEY:
+        sys.exit("❌ Error: DASHSCOPE_API_KEY not found")
+    
+    print("\n" + SEP)
     print("🧪 RAG Quality Test Suite")
-    print("=" * 60)
+    print(SEP)
     print()
     
-    # 1. Statistics
-    test_vectordb_stats()
-    
-    # 2. Basic retrieval quality test
-    test_retrieval_quality()
+    # Open the vector database once before the phases fan out
+    _rag("db5_qwen").vectordb
     
-    # 3. User real-world scenario test (newly added)
-    test_user_scenarios()
+    # 1-3. Statistics, basic retrieval quality and user scenarios are independent:
+    # run them concurrently, then print each phase's report in order
+    phases = (
+        test_vectordb_stats,
+        test_retrieval_quality,
+        lambda: asyncio.run(test_user_scenarios()),
+    )
+    with ThreadPoolExecutor(max_workers=len(phases)) as executor:
+        futures = [executor.submit(_run_captured, phase) for phase in phases]
+        for future in futures:
+            output, error = future.result()
+            sys.stdout.write(output)
+            if error is not None:
+                raise error
     
-    # 4. Performance test
+    # 4. Performance test (run on its own so concurrent phases don't skew its timings)
     test_performance()
     
-    print("\n" + "=" * 60)
+    print("\n" + SEP)
     print("✅ Test Completed!")
-    print("=" * 60)
+    print(SEP)
     print("\n💡 Tips:")
     print("   - If keyword coverage <40%, consider adjusting lambda_mult parameter")
     print("   - If retrieval speed >3 seconds, check network connection or API quota")
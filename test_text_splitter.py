@@ -0,0 +1,105 @@
+"""
+Text Splitter Equivalence Test
+Checks that LiteralSeparatorTextSplitter (vectorize_knowledge_base.py) produces exactly the
+same chunks as LangChain's RecursiveCharacterTextSplitter, which it re-implements for speed.
+Re-run after upgrading langchain-text-splitters.
+
+Usage:
+    python test_text_splitter.py      (or: python -m pytest test_text_splitter.py)
+"""
+
+import random
+import sys
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from vectorize_knowledge_base import CHUNK_OVERLAP, CHUNK_SIZE, LiteralSeparatorTextSplitter
+
+# Same separators as vectorize_knowledge_base.main()
+SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+KEEP_SEPARATOR_MODES = (True, False, "start", "end")
+# (chunk_size, chunk_overlap) pairs, from the production setting down to sizes that force deep recursion
+SIZES = ((CHUNK_SIZE, CHUNK_OVERLAP), (50, 10), (20, 0), (7, 3))
+# Fragments that random texts are built from (separators, runs of them, words, overlong tokens)
+FRAGMENTS = ["a", "b", "word", " ", ". ", "\n", "\n\n", "x" * 50, ".", "  ", "Zino's petrel"]
+TEXTS_PER_CASE = 300
+
+SEP = "=" * 60
+
+
+def _random_texts(seed=1):
+    """Reproducible random texts mixing all separators"""
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 400)))
+        for _ in range(TEXTS_PER_CASE)
+    ]
+
+
+def _sample_page():
+    """A page-like text: paragraphs of sentences, plus one long unbroken paragraph"""
+    sentence = "Zino's petrel nests in burrows in the central mountains of Madeira. "
+    paragraphs = [sentence * n for n in (3, 12, 40)]
+    return "\n\n".join(paragraphs) + "\n" + "\n".join(sentence.strip() for _ in range(25))
+
+
+def _splitters(keep_separator, chunk_size, chunk_overlap):
+    kwargs = dict(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+        separators=SEPARATORS, keep_separator=keep_separator
+    )
+    return RecursiveCharacterTextSplitter(**kwargs), LiteralSeparatorTextSplitter(**kwargs)
+
+
+def test_matches_recursive_splitter():
+    """Random texts: identical chunks for every keep_separator mode and chunk size"""
+    texts = _random_texts() + [_sample_page()]
+    for keep_separator in KEEP_SEPARATOR_MODES:
+        for chunk_size, chunk_overlap in SIZES:
+            reference, fast = _splitters(keep_separator, chunk_size, chunk_overlap)
+            for text in texts:
+                assert fast.split_text(text) == reference.split_text(text), (
+                    f"keep_separator={keep_separator!r}, chunk_size={chunk_size}, text={text!r}"
+                )
+
+
+def test_matches_recursive_splitter_on_documents():
+    """split_documents (the path vectorize_documents uses): same contents and metadata"""
+    from langchain_core.documents import Document
+
+    pages = [Document(page_content=_sample_page(), metadata={"source_file": "sample.pdf", "page": 1})]
+    reference, fast = _splitters(True, CHUNK_SIZE, CHUNK_OVERLAP)
+    expected = reference.split_documents(pages)
+    actual = fast.split_documents(pages)
+    assert [(doc.page_content, doc.metadata) for doc in actual] == \
+        [(doc.page_content, doc.metadata) for doc in expected]
+
+
+def test_regex_separators_use_parent():
+    """Regex separators are delegated to RecursiveCharacterTextSplitter unchanged"""
+    kwargs = dict(chunk_size=20, chunk_overlap=5, separators=[r"\.\s+", r"\s+", ""], is_separator_regex=True)
+    reference = RecursiveCharacterTextSplitter(**kwargs)
+    fast = LiteralSeparatorTextSplitter(**kwargs)
+    for text in _random_texts(seed=2)[:50]:
+        assert fast.split_text(text) == reference.split_text(text)
+
+
+def main():
+    """Main function"""
+    print(SEP)
+    print("🧪 Text Splitter Equivalence Test")
+    print(SEP)
+
+    failed = 0
+    for test in (test_matches_recursive_splitter, test_matches_recursive_splitter_on_documents,
+                 test_regex_separators_use_parent):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(SEP)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
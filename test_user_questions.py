@@ -6,150 +6,95 @@ Usage:
     python test_user_questions.py
 """
 
+import asyncio
+import io
 import os
-import time
+import sys
 from dotenv import load_dotenv
 from rag_utils import get_rag_instance
+from user_tests_data import USER_TESTS, build_keyword_automaton, keyword_hit_matrix, retrieve_concurrently
 
 # Load environment variables
 load_dotenv()
 
-def test_user_questions(lambda_mult=0.3):
+# Resolved once for the whole script
+_API_KEY = os.getenv("DASHSCOPE_API_KEY")
+
+# Report banners (built once)
+SEP = "=" * 70
+DASH = "─" * 70
+
+async def test_user_questions(lambda_mult=0.3):
     """Test 9 real questions provided by users"""
-    print("=" * 70)
+    print(SEP)
     print(f"👥 User Real Questions Test (lambda_mult={lambda_mult})")
-    print("=" * 70)
+    print(SEP)
     print("Testing RAG retrieval effectiveness for the following 9 user questions:")
     print()
     
-    # Check API Key
-    api_key = os.getenv("DASHSCOPE_API_KEY")
-    if not api_key:
-        print("❌ Error: DASHSCOPE_API_KEY not found")
-        return
-    
     # Initialize RAG
-    rag = get_rag_instance("db5_qwen", api_key)
+    rag = get_rag_instance("db5_qwen", _API_KEY)
     
     # 9 user questions
-    questions = [
-        {
-            "id": 1,
-            "text": "Hi, how are you doing today?",
-            "type": "Greeting",
-            "sticker": "None",
-            "keywords": ["petrel", "bird", "good", "fine"]
-        },
-        {
-            "id": 2,
-            "text": "Where do you usually have your nesting areas?",
-            "type": "Habitat",
-            "sticker": "🏡 Home",
-            "keywords": ["nest", "Madeira", "mountains", "cliffs", "caves"]
-        },
-        {
-            "id": 3,
-            "text": "How long do you live approximately?",
-            "type": "Lifespan",
-            "sticker": "None",
-            "keywords": ["years", "lifespan", "live", "age"]
-        },
-        {
-            "id": 4,
-            "text": "Why do you need to abort sometimes to protect your species, that's a very sad thing and I don't quite understand how does it help you",
-            "type": "Conservation Strategy",
-            "sticker": "🌱 Helper (Possible)",
-            "keywords": ["conservation", "protection", "breeding", "survival", "predators"]
-        },
-        {
-            "id": 5,
-            "text": "How long do you sleep?",
-            "type": "Daily Habits",
-            "sticker": "🌙 Routine (Possible)",
-            "keywords": ["sleep", "rest", "night", "day", "active"]
-        },
-        {
-            "id": 6,
-            "text": "How do I find you?",
-            "type": "Observation Guide",
-            "sticker": "🏡 Home (If not triggered)",
-            "keywords": ["Madeira", "mountains", "sea", "observation", "location"]
-        },
-        {
-            "id": 7,
-            "text": "Do you have a friend?",
-            "type": "Social",
-            "sticker": "None",
-            "keywords": ["mate", "colony", "pair", "social", "alone"]
-        },
-        {
-            "id": 8,
-            "text": "What do you eat for food and how do you catch it?",
-            "type": "Diet",
-            "sticker": "🍽️ Food",
-            "keywords": ["fish", "squid", "food", "catch", "hunt", "sea"]
-        },
-        {
-            "id": 9,
-            "text": "How can I help you and your species thrive?",
-            "type": "Conservation Actions",
-            "sticker": "🌱 Helper",
-            "keywords": ["help", "protect", "conservation", "support", "habitat"]
-        }
-    ]
+    questions = USER_TESTS
     
-    total_coverage = 0
-    total_time = 0
     passed = 0
     
-    for q in questions:
-        print(f"\n{'─' * 70}")
-        print(f"Question {q['id']}/9: {q['type']}")
-        print(f"{'─' * 70}")
-        print(f"❓ {q['text']}")
-        print(f"🎁 Expected Sticker: {q['sticker']}")
-        
-        # Retrieve
-        start_time = time.time()
-        docs = rag.retrieve(q['text'], lambda_mult=lambda_mult)
-        elapsed = time.time() - start_time
-        total_time += elapsed
+    automaton = build_keyword_automaton(kw for q in questions for kw in q['keywords_lc'])
+    
+    # Retrieve all questions concurrently, each one timed on its own
+    results = await retrieve_concurrently(rag, [q['query'] for q in questions], lambda_mult)
+    total_time = sum(elapsed for _, elapsed in results)
+    
+    # Keyword coverage for all questions
+    hits, coverages = keyword_hit_matrix(
+        [[doc.page_content.lower() for doc in docs] for docs, _ in results], questions, automaton
+    )
+    
+    for i, (q, (docs, elapsed)) in enumerate(zip(questions, results)):
+        # Format the whole report for this question, then write it out at once
+        buf = io.StringIO()
+        print(f"\n{DASH}", file=buf)
+        print(f"Question {q['id']}/9: {q['category']}", file=buf)
+        print(DASH, file=buf)
+        print(f"❓ {q['query']}", file=buf)
+        print(f"🎁 Expected Sticker: {q['expected_sticker'] or 'None'}", file=buf)
         
         # Analyze results
-        all_content = " ".join([doc.page_content.lower() for doc in docs])
-        found = [kw for kw in q['keywords'] if kw.lower() in all_content]
-        coverage = (len(found) / len(q['keywords']) * 100) if q['keywords'] else 0
-        total_coverage += coverage
+        found = [kw for kw, hit in zip(q['expected_keywords'], hits[i]) if hit]
+        coverage = coverages[i]
         
         # Output results
-        print(f"\n⏱️  {elapsed:.2f}s | 📄 {len(docs)} documents | ✅ {coverage:.0f}% coverage")
+        print(f"\n⏱️  {elapsed:.2f}s | 📄 {len(docs)} documents | ✅ {coverage:.0f}% coverage", file=buf)
         
         if found:
-            print(f"🔍 Found keywords: {', '.join(found)}")
+            print(f"🔍 Found keywords: {', '.join(found)}", file=buf)
         else:
-            print(f"⚠️  No keywords found")
+            print(f"⚠️  No keywords found", file=buf)
         
         # Show sources
         if docs:
             source = docs[0].metadata.get('source_file', 'Unknown')
             page = docs[0].metadata.get('page', '?')
             preview = docs[0].page_content[:100].replace('\n', ' ')
-            print(f"📚 Main source: {source} (Page {page})")
-            print(f"   Preview: {preview}...")
+            print(f"📚 Main source: {source} (Page {page})", file=buf)
+            print(f"   Preview: {preview}...", file=buf)
         
         # Evaluate
         if coverage >= 50:
-            print(f"✅ Passed")
+            print(f"✅ Passed", file=buf)
             passed += 1
         else:
-            print(f"⚠️  Needs optimization")
+            print(f"⚠️  Needs optimization", file=buf)
+        
+        sys.stdout.write(buf.getvalue())
     
     # Summary
-    print(f"\n{'=' * 70}")
+    print(f"\n{SEP}")
     print(f"📊 Test Summary")
-    print(f"{'=' * 70}")
+    print(SEP)
     print(f"✅ Passed: {passed}/9 ({passed/9*100:.0f}%)")
-    print(f"📈 Average coverage: {total_coverage/9:.1f}%")
+    print(f"📈 Average coverage: {coverages.mean():.1f}%")
     print(f"⏱️  Average time: {total_time/9:.2f} seconds")
     
     # Rating
@@ -172,5 +117,7 @@ def test_user_questions(lambda_mult=0.3):
     print()
 
 if __name__ == "__main__":
-    test_user_questions()
+    if not _API_KEY:
+        sys.exit("❌ Error: DASHSCOPE_API_KEY not found")
+    asyncio.run(test_user_questions())
 
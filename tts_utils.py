@@ -4,10 +4,242 @@ Strictly follows qwen3-tts-flash official examples
 """
 
 import os
-import base64
-import uuid
-import tempfile
-import streamlit.components.v1 as components
+import glob
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed, wait
+from io import BytesIO
+from xml.sax.saxutils import escape, quoteattr
+import requests
+from requests.adapters import HTTPAdapter
+
+# Synthesis SDKs are imported once here; each backend is optional and reports itself unavailable
+try:
+    from dashscope.audio.qwen_tts import SpeechSynthesizer
+except ImportError:
+    SpeechSynthesizer = None
+
+try:
+    from openai import OpenAI
+except ImportError:
+    OpenAI = None
+
+try:
+    from gtts import gTTS
+except ImportError:
+    gTTS = None
+
+# Shared HTTP session: consecutive TTS calls reuse warm keep-alive connections (audio downloads, Azure)
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+# Verbose [TTS DEBUG] logging (printing is not free under Streamlit's stdout redirect)
+_TTS_DEBUG = os.getenv("TTS_DEBUG") == "1"
+# Backend failure tracebacks go to debug logging (formatted only when DEBUG is enabled)
+log = logging.getLogger(__name__)
+# (connect, read) seconds: an unreachable host fails after 2s instead of burning the whole budget
+TTS_HTTP_TIMEOUT = (2, 8)
+
+
+def close_tts_session():
+    """Close the shared TTS HTTP session and its pooled connections (e.g. on shutdown)"""
+    _HTTP.close()
+
+
+_pool_warmed = False
+_pool_warm_lock = threading.Lock()
+
+
+def _warm_pool():
+    """
+    Open a pooled connection to the Azure TTS host (TCP + TLS handshake) in the background, once
+    
+    Called on the first Azure (European Portuguese) speak(), so importing the module and
+    English-only sessions never open it. Only Azure
+    goes through _HTTP to a fixed host: Qwen synthesis uses the dashscope SDK's own client.
+    """
+    global _pool_warmed
+    with _pool_warm_lock:
+        if _pool_warmed:
+            return
+        _pool_warmed = True
+    
+    if not os.getenv("AZURE_TTS_KEY"):
+        return
+    host = f"https://{os.getenv('AZURE_TTS_REGION', 'westeurope')}.tts.speech.microsoft.com"
+    
+    def warm():
+        try:
+            _HTTP.head(host, timeout=(2, 2))
+        except requests.RequestException:
+            pass  # Warmup is best effort; the real request reports any failure
+    
+    threading.Thread(target=warm, name="tts-warmup", daemon=True).start()
+
+# ==================== Synthesized Audio Cache ====================
+# Repeated phrases are served from memory or disk (raw mp3 bytes) instead of being re-synthesized
+TTS_CACHE_DIR = ".tts_cache"
+TTS_CACHE_SIZE = 64                   # Entries kept in memory
+TTS_CACHE_TTL = 7 * 24 * 3600         # Disk entries older than this are pruned (seconds)
+TTS_CACHE_PRUNE_INTERVAL = 3600       # Minimum time between disk prunes (seconds)
+TTS_HEDGE_DELAY = 0.5                 # Seconds to wait for Azure before also asking OpenAI
+TTS_HEDGE_TIMEOUT = 10.0              # Overall deadline for Azure/OpenAI before falling back to gTTS (seconds)
+
+_tts_memory_cache = OrderedDict()
+_tts_cache_lock = threading.Lock()
+_tts_last_prune = 0.0
+
+
+def _tts_cache_key(model, voice, language, text):
+    """Content address of one synthesis request"""
+    return hashlib.sha256(f"{model}|{voice}|{language}|{text}".encode("utf-8")).hexdigest()
+
+
+def _tts_cache_get(key):
+    """
+    Look up synthesized audio
+    
+    Returns:
+        bytes: mp3 audio, or None on a miss
+    """
+    with _tts_cache_lock:
+        audio_bytes = _tts_memory_cache.get(key)
+        if audio_bytes is not None:
+            _tts_memory_cache.move_to_end(key)
+            return audio_bytes
+    
+    try:
+        with open(os.path.join(TTS_CACHE_DIR, f"{key}.mp3"), "rb") as f:
+            audio_bytes = f.read()
+    except OSError:
+        return None
+    
+    _tts_memory_put(key, audio_bytes)
+    return audio_bytes
+
+
+def _tts_memory_put(key, audio_bytes):
+    """Insert into the in-memory LRU tier"""
+    with _tts_cache_lock:
+        _tts_memory_cache[key] = audio_bytes
+        _tts_memory_cache.move_to_end(key)
+        if len(_tts_memory_cache) > TTS_CACHE_SIZE:
+            _tts_memory_cache.popitem(last=False)  # Evict the least recently used entry
+
+
+def _tts_cache_put(key, audio_bytes, model, voice):
+    """Store synthesized audio in memory and as an mp3 file (plus metadata sidecar) on disk"""
+    _tts_memory_put(key, audio_bytes)
+    try:
+        os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+        audio_path = os.path.join(TTS_CACHE_DIR, f"{key}.mp3")
+        with open(audio_path + ".tmp", "wb") as f:
+            f.write(audio_bytes)
+        os.replace(audio_path + ".tmp", audio_path)  # Readers never see a partial file
+        with open(os.path.join(TTS_CACHE_DIR, f"{key}.json"), "w") as f:
+            json.dump({"created": time.time(), "model": model, "voice": voice}, f)
+    except OSError as e:
+        print(f"[TTS Cache] ⚠️ Could not write disk cache: {e}")
+
+
+class _Breaker:
+    """
+    Per-backend circuit breaker
+    
+    After `threshold` consecutive failures the backend is skipped (fails fast) for `cooldown`
+    seconds; then a single trial call is let through, and one success closes the breaker again.
+    """
+    
+    def __init__(self, threshold=5, cooldown=60):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+    
+    def allow(self):
+        """Whether a call may be made now"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                # Half-open: this caller gets the trial call, others keep failing fast
+                self.opened_at = time.monotonic()
+                return True
+            return False
+    
+    def record(self, success):
+        """Record the outcome of an allowed call"""
+        with self._lock:
+            if success:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= self.threshold:
+                    self.opened_at = time.monotonic()
+
+
+_QWEN_BREAKER = _Breaker()
+_AZURE_BREAKER = _Breaker()
+_OPENAI_BREAKER = _Breaker()
+
+
+def _cached_tts(model, voice, language, text, synthesize, breaker=None):
+    """
+    Return cached audio for a request, or call synthesize() and cache its result
+    
+    Args:
+        model, voice, language, text: Request parameters (together form the cache key)
+        synthesize: Callable returning (success, audio_bytes or error_message)
+        breaker: Optional _Breaker guarding the backend behind synthesize()
+    
+    Returns:
+        tuple: (success, audio_bytes or error_message)
+    """
+    key = _tts_cache_key(model, voice, language, text)
+    audio_bytes = _tts_cache_get(key)
+    if audio_bytes is not None:
+        print(f"[TTS Cache] ✅ Hit ({model}, {voice})")
+        return True, audio_bytes
+    
+    if breaker is not None and not breaker.allow():
+        return False, f"{model} skipped: circuit open after repeated failures"
+    
+    success, result = synthesize()
+    if breaker is not None:
+        breaker.record(success)
+    if success:
+        _tts_cache_put(key, result, model, voice)
+    return success, result
+
+
+def _prune_tts_cache():
+    """Delete disk cache entries older than TTS_CACHE_TTL (at most once per TTS_CACHE_PRUNE_INTERVAL)"""
+    global _tts_last_prune
+    now = time.time()
+    if now - _tts_last_prune < TTS_CACHE_PRUNE_INTERVAL:
+        return 0
+    _tts_last_prune = now
+    
+    pruned = 0
+    for meta_path in glob.glob(os.path.join(TTS_CACHE_DIR, "*.json")):
+        try:
+            with open(meta_path) as f:
+                created = json.load(f).get("created", 0)
+        except (OSError, ValueError):
+            created = 0
+        if now - created > TTS_CACHE_TTL:
+            for path in (meta_path, meta_path[:-len(".json")] + ".mp3"):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            pruned += 1
+    return pruned
 
 
 def speak_with_qwen(text, voice="Cherry", model="qwen3-tts-flash"):
@@ -21,17 +253,18 @@ def speak_with_qwen(text, voice="Cherry", model="qwen3-tts-flash"):
         model: TTS model (default qwen3-tts-flash)
     
     Returns:
-        tuple: (success, audio_data_base64 or error_message)
+        tuple: (success, mp3 audio bytes or error_message)
     """
+    if SpeechSynthesizer is None:
+        return False, "dashscope not installed"
+    
     try:
-        import requests
-        from dashscope.audio.qwen_tts import SpeechSynthesizer
-        
         api_key = os.getenv("DASHSCOPE_API_KEY")
         if not api_key:
             return False, "Missing API Key"
         
-        print(f"[TTS DEBUG] Model: {model}, Voice: {voice}")
+        if _TTS_DEBUG:
+            print(f"[TTS DEBUG] Model: {model}, Voice: {voice}")
         
         # According to official comment: dashscope.audio.qwen_tts.SpeechSynthesizer.call(...)
         response = SpeechSynthesizer.call(
@@ -42,56 +275,35 @@ def speak_with_qwen(text, voice="Cherry", model="qwen3-tts-flash"):
             format='mp3'
         )
         
-        print(f"[TTS DEBUG] Response type: {type(response)}")
-        
-        # Response is dict-like object, access as dictionary
-        audio_url = None
+        if _TTS_DEBUG:
+            print(f"[TTS DEBUG] Response: {response}")
         
-        if hasattr(response, 'output'):
-            print(f"[TTS DEBUG] Has output attribute")
+        # Response output is dict-like; its audio is a dict or an object carrying the url
+        try:
             output = response.output
-            print(f"[TTS DEBUG] output type: {type(output)}")
-            print(f"[TTS DEBUG] output: {output}")
-            
-            if hasattr(output, 'audio'):
-                print(f"[TTS DEBUG] Has audio attribute")
-                audio = output.audio
-                print(f"[TTS DEBUG] audio type: {type(audio)}")
-                print(f"[TTS DEBUG] audio: {audio}")
-                
-                # audio could be dict or object
-                if isinstance(audio, dict):
-                    audio_url = audio.get('url')
-                    print(f"[TTS DEBUG] Extracted URL (dict): {audio_url}")
-                else:
-                    audio_url = getattr(audio, 'url', None)
-                    print(f"[TTS DEBUG] Extracted URL (attr): {audio_url}")
-            elif isinstance(output, dict) and 'audio' in output:
-                print(f"[TTS DEBUG] output is dict, extracting audio")
-                audio = output['audio']
-                print(f"[TTS DEBUG] audio from dict: {audio}")
-                audio_url = audio.get('url') if isinstance(audio, dict) else getattr(audio, 'url', None)
-                print(f"[TTS DEBUG] Extracted URL (from dict): {audio_url}")
+            audio = output["audio"] if isinstance(output, dict) else output.audio
+            audio_url = audio["url"] if isinstance(audio, dict) else audio.url
+        except (AttributeError, KeyError, TypeError):
+            audio_url = None
         
         if audio_url:
-            print(f"[TTS DEBUG] Audio URL: {audio_url}")
+            if _TTS_DEBUG:
+                print(f"[TTS DEBUG] Audio URL: {audio_url}")
             
             # Download audio
-            audio_response = requests.get(audio_url, timeout=10)
+            audio_response = _HTTP.get(audio_url, timeout=TTS_HTTP_TIMEOUT)
             audio_response.raise_for_status()
             
-            # Convert to base64
             audio_data = audio_response.content
-            b64_audio = base64.b64encode(audio_data).decode()
             
-            print(f"[TTS DEBUG] ✅ Success! Audio size: {len(audio_data)} bytes")
-            return True, b64_audio
+            if _TTS_DEBUG:
+                print(f"[TTS DEBUG] ✅ Success! Audio size: {len(audio_data)} bytes")
+            return True, audio_data
         
         return False, f"No audio URL in response: {response}"
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        log.debug("Qwen TTS failed", exc_info=True)
         return False, f"Qwen TTS failed: {str(e)}"
 
 
@@ -99,10 +311,10 @@ def speak_with_openai_european_portuguese(text, voice="onyx"):
     """
     Use OpenAI TTS to generate European Portuguese speech
     """
+    if OpenAI is None:
+        return False, "openai not installed"
+    
     try:
-        from openai import OpenAI
-        import base64
-        
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             return False, "Missing OpenAI API Key"
@@ -118,26 +330,30 @@ def speak_with_openai_european_portuguese(text, voice="onyx"):
             input=text
         )
         
-        # Convert audio to base64 instead of saving to file
+        # Keep the audio in memory instead of saving to file
         audio_data = response.content
-        b64_audio = base64.b64encode(audio_data).decode()
         
         print(f"[OpenAI TTS] ✅ Success! European Portuguese audio size: {len(audio_data)} bytes")
-        return True, b64_audio
+        return True, audio_data
             
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        log.debug("OpenAI European Portuguese TTS failed", exc_info=True)
         return False, f"OpenAI European Portuguese TTS failed: {str(e)}"
 
 
+# Azure TTS request template (built once; text is XML-escaped per call)
+_AZURE_SSML_TMPL = "<speak version='1.0' xml:lang='pt-PT'><voice xml:lang='pt-PT' name={voice}>{text}</voice></speak>"
+_AZURE_HEADERS = {
+    'Content-Type': 'application/ssml+xml',
+    'X-Microsoft-OutputFormat': 'audio-16khz-128kbitrate-mono-mp3'
+}
+
+
 def speak_with_azure_european_portuguese(text, voice="pt-PT-DuarteNeural"):
     """
     Use Azure TTS to generate high-quality European Portuguese speech (recommended)
     """
     try:
-        import requests
-        
         azure_key = os.getenv("AZURE_TTS_KEY")
         azure_region = os.getenv("AZURE_TTS_REGION", "westeurope")
         
@@ -146,118 +362,127 @@ def speak_with_azure_european_portuguese(text, voice="pt-PT-DuarteNeural"):
         
         print(f"[Azure TTS] Generating European Portuguese audio with voice: {voice}")
         
-        # Azure TTS request
-        headers = {
-            'Ocp-Apim-Subscription-Key': azure_key,
-            'Content-Type': 'application/ssml+xml',
-            'X-Microsoft-OutputFormat': 'audio-16khz-128kbitrate-mono-mp3'
-        }
-        
-        ssml = f"""
-        <speak version='1.0' xml:lang='pt-PT'>
-            <voice xml:lang='pt-PT' name='{voice}'>
-                {text}
-            </voice>
-        </speak>
-        """
+        # Azure TTS request (characters like & and < in the text would otherwise break the SSML)
+        ssml = _AZURE_SSML_TMPL.format(voice=quoteattr(voice), text=escape(text))
         
-        response = requests.post(
+        response = _HTTP.post(
             f"https://{azure_region}.tts.speech.microsoft.com/cognitiveservices/v1",
-            headers=headers,
+            headers={**_AZURE_HEADERS, 'Ocp-Apim-Subscription-Key': azure_key},
             data=ssml.encode('utf-8'),
-            timeout=10
+            timeout=TTS_HTTP_TIMEOUT
         )
         
         if response.status_code == 200:
-            # Convert to base64
             audio_data = response.content
-            b64_audio = base64.b64encode(audio_data).decode()
             
             print(f"[Azure TTS] ✅ Success! European Portuguese audio size: {len(audio_data)} bytes")
-            return True, b64_audio
+            return True, audio_data
         else:
             return False, f"Azure TTS failed: {response.status_code} - {response.text}"
             
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        log.debug("Azure TTS failed", exc_info=True)
         return False, f"Azure TTS error: {str(e)}"
 
 
+def _azure_pt_tts(text):
+    """Azure European Portuguese synthesis (through the audio cache)"""
+    return _cached_tts(
+        "azure-tts", "pt-PT-DuarteNeural", "pt-PT", text,
+        lambda: speak_with_azure_european_portuguese(text, voice="pt-PT-DuarteNeural"),
+        breaker=_AZURE_BREAKER
+    )
+
+
+def _openai_pt_tts(text):
+    """OpenAI European Portuguese synthesis (through the audio cache)"""
+    return _cached_tts(
+        "tts-1", "onyx", "pt-PT", text,
+        lambda: speak_with_openai_european_portuguese(text, voice="onyx"),
+        breaker=_OPENAI_BREAKER
+    )
+
+
+def _hedged_european_portuguese_tts(text):
+    """
+    Race Azure and OpenAI without paying for both when Azure is healthy
+    
+    Azure is asked first; OpenAI is only fired if Azure fails or has not answered
+    within TTS_HEDGE_DELAY seconds, after which the first success wins. If neither has
+    answered within TTS_HEDGE_TIMEOUT seconds, the call fails so speak() can fall back to gTTS.
+    
+    Returns:
+        tuple: (success, mp3 audio bytes or error_message, method)
+    """
+    executor = ThreadPoolExecutor(max_workers=2)
+    start = time.monotonic()
+    try:
+        futures = {executor.submit(_azure_pt_tts, text): "Azure European Portuguese TTS"}
+        done, _ = wait(futures, timeout=TTS_HEDGE_DELAY)
+        if done:
+            success, result = next(iter(done)).result()
+            if success:
+                return True, result, "Azure European Portuguese TTS"
+            print(f"[TTS] ❌ Azure TTS failed, falling back to OpenAI: {result}")
+        else:
+            print(f"[TTS] Azure TTS slower than {TTS_HEDGE_DELAY}s, hedging with OpenAI...")
+        
+        futures[executor.submit(_openai_pt_tts, text)] = "OpenAI European Portuguese TTS"
+        errors = []
+        try:
+            for future in as_completed(futures, timeout=TTS_HEDGE_TIMEOUT - (time.monotonic() - start)):
+                success, result = future.result()
+                if success:
+                    return True, result, futures[future]
+                errors.append(result)
+        except FutureTimeoutError:
+            errors.append(f"no answer within {TTS_HEDGE_TIMEOUT}s")
+        return False, "; ".join(errors), "None"
+    finally:
+        # Don't wait for the loser; whatever it returns still lands in the audio cache
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def speak(text, voice="Cherry", timeout=10, language="English", portuguese_variant="european"):
     """
     Smart TTS function: English uses Qwen TTS, Portuguese uses European Portuguese TTS
-    """
     
+    Returns:
+        tuple: (success, mp3 audio bytes or error_message, method); play the bytes with
+               st.audio(audio_bytes, format="audio/mp3", autoplay=True)
+    """
     if language == "Portuguese":
-        # Try Azure TTS first (best quality)
         if portuguese_variant == "european":
-            print(f"[TTS] Using Azure TTS for European Portuguese...")
-            success, result = speak_with_azure_european_portuguese(text, voice="pt-PT-DuarteNeural")
-            
-            if success:
-                print(f"[TTS] ✅ Azure European Portuguese TTS succeeded")
-                audio_id = str(uuid.uuid4())
-                audio_html = f"""
-                    <audio id="{audio_id}" autoplay>
-                        <source src="data:audio/mp3;base64,{result}" type="audio/mp3">
-                    </audio>
-                    <script>
-                        const audio = document.getElementById('{audio_id}');
-                        if (audio) {{
-                            audio.play().catch(e => console.log('Playback error:', e));
-                        }}
-                    </script>
-                """
-                return True, audio_html, "Azure European Portuguese TTS"
-            
-            # Azure failed, fallback to OpenAI
-            print(f"[TTS] ❌ Azure TTS failed, falling back to OpenAI: {result}")
-        
-        # Use OpenAI TTS to generate European Portuguese speech
-        print(f"[TTS] Using OpenAI TTS for European Portuguese (voice: onyx)...")
-        success, result = speak_with_openai_european_portuguese(text, voice="onyx")
+            # Azure TTS first (best quality), hedged with OpenAI if it is slow or fails
+            print(f"[TTS] Using Azure TTS for European Portuguese (OpenAI as hedge)...")
+            _warm_pool()
+            success, result, method = _hedged_european_portuguese_tts(text)
+        else:
+            # Use OpenAI TTS to generate European Portuguese speech
+            print(f"[TTS] Using OpenAI TTS for European Portuguese (voice: onyx)...")
+            success, result = _openai_pt_tts(text)
+            method = "OpenAI European Portuguese TTS"
         
         if success:
-            print(f"[TTS] ✅ OpenAI European Portuguese TTS succeeded")
-            audio_id = str(uuid.uuid4())
-            audio_html = f"""
-                <audio id="{audio_id}" autoplay>
-                    <source src="data:audio/mp3;base64,{result}" type="audio/mp3">
-                </audio>
-                <script>
-                    const audio = document.getElementById('{audio_id}');
-                    if (audio) {{
-                        audio.play().catch(e => console.log('Playback error:', e));
-                    }}
-                </script>
-            """
-            return True, audio_html, "OpenAI European Portuguese TTS"
+            print(f"[TTS] ✅ {method} succeeded")
+            return True, result, method
         else:
-            # OpenAI TTS failed, fallback to gTTS with European Portuguese
-            print(f"[TTS] ❌ OpenAI European Portuguese TTS failed: {result}")
+            # Azure and OpenAI both failed, fallback to gTTS with European Portuguese
+            print(f"[TTS] ❌ European Portuguese TTS failed: {result}")
             return _fallback_gtts_european_portuguese(text)
             
     else:
         # Use Qwen TTS to generate English speech
         print(f"[TTS] Using Qwen TTS for English (voice: {voice})...")
-        success, result = speak_with_qwen(text, voice=voice, model="qwen3-tts-flash")
+        success, result = _cached_tts(
+            "qwen3-tts-flash", voice, language, text,
+            lambda: speak_with_qwen(text, voice=voice, model="qwen3-tts-flash"),
+            breaker=_QWEN_BREAKER
+        )
         
         if success:
             print(f"[TTS] ✅ Qwen TTS succeeded")
-            audio_id = str(uuid.uuid4())
-            audio_html = f"""
-                <audio id="{audio_id}" autoplay>
-                    <source src="data:audio/mp3;base64,{result}" type="audio/mp3">
-                </audio>
-                <script>
-                    const audio = document.getElementById('{audio_id}');
-                    if (audio) {{
-                        audio.play().catch(e => console.log('Playback error:', e));
-                    }}
-                </script>
-            """
-            return True, audio_html, "Qwen TTS"
+            return True, result, "Qwen TTS"
         else:
             # Qwen TTS failed, fallback to gTTS
             print(f"[TTS] ❌ Qwen TTS failed: {result}")
@@ -268,25 +493,21 @@ def _fallback_gtts_european_portuguese(text):
     """
     gTTS fallback solution - European Portuguese
     """
+    if gTTS is None:
+        return False, "All European Portuguese TTS methods failed. gtts not installed", "None"
+    
     try:
-        from gtts import gTTS
-        import tempfile
-        
         print(f"[TTS] Falling back to gTTS for European Portuguese...")
         
         # gTTS uses 'pt' parameter, but pronunciation is closer to European Portuguese
         tts = gTTS(text=text, lang='pt', slow=False)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp_file:
-            tts.save(tmp_file.name)
-            
-        audio_html = f"""
-            <audio autoplay controls style="width: 100%; height: 50px;">
-                <source src="{tmp_file.name}" type="audio/mp3">
-                Your browser does not support the audio element.
-            </audio>
-        """
+        # Synthesize straight into memory (no temporary file)
+        buffer = BytesIO()
+        tts.write_to_fp(buffer)
+        audio_bytes = buffer.getvalue()
+        
         print(f"[TTS] ✅ gTTS European Portuguese fallback succeeded")
-        return True, audio_html, "gTTS European Portuguese (fallback)"
+        return True, audio_bytes, "gTTS European Portuguese (fallback)"
         
     except Exception as e:
         error_msg = f"All European Portuguese TTS methods failed. Last error: {str(e)}"
@@ -298,24 +519,20 @@ def _fallback_gtts(text, lang="en"):
     """
     gTTS fallback solution
     """
+    if gTTS is None:
+        return False, "All TTS methods failed. gtts not installed", "None"
+    
     try:
-        from gtts import gTTS
-        import tempfile
-        
         print(f"[TTS] Falling back to gTTS (lang: {lang})...")
         
         tts = gTTS(text=text, lang=lang, slow=False)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp_file:
-            tts.save(tmp_file.name)
-            
-        audio_html = f"""
-            <audio autoplay controls style="width: 100%; height: 50px;">
-                <source src="{tmp_file.name}" type="audio/mp3">
-                Your browser does not support the audio element.
-            </audio>
-        """
+        # Synthesize straight into memory (no temporary file)
+        buffer = BytesIO()
+        tts.write_to_fp(buffer)
+        audio_bytes = buffer.getvalue()
+        
         print(f"[TTS] ✅ gTTS fallback succeeded")
-        return True, audio_html, "gTTS (fallback)"
+        return True, audio_bytes, "gTTS (fallback)"
         
     except Exception as e:
         error_msg = f"All TTS methods failed. Last error: {str(e)}"
@@ -324,16 +541,11 @@ def _fallback_gtts(text, lang="en"):
 
 
 def cleanup_audio_files():
-    """Clean up temporary audio files"""
+    """Clean up audio files (all backends synthesize in memory, so only the cache needs pruning)"""
     try:
-        # Clean up any leftover temporary files
-        import glob
-        temp_files = glob.glob("/tmp/tmp*mp3") + glob.glob("/var/folders/*/*/tmp*mp3")
-        for temp_file in temp_files:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
-        print(f"[TTS Cleanup] Cleaned {len(temp_files)} temporary files")
+        # Prune aged entries from the synthesized audio cache
+        pruned = _prune_tts_cache()
+        if pruned:
+            print(f"[TTS Cleanup] Pruned {pruned} expired cache entries")
     except Exception as e:
         print(f"[TTS Cleanup] Error during cleanup: {e}")
\ No newline at end of file
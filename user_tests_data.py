@@ -0,0 +1,143 @@
+"""
+Shared User Question Test Data
+The 9 real user questions used by test_rag_quality.py and test_user_questions.py,
+plus the keyword-coverage and concurrent-retrieval helpers both scripts use
+"""
+
+import asyncio
+import sys
+import time
+from types import MappingProxyType
+import numpy as np
+
+try:
+    import ahocorasick  # Optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def build_keyword_automaton(keywords_lc):
+    """Build one Aho-Corasick automaton over all (lowercase) expected keywords (None if pyahocorasick is missing)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords_lc:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+def find_keywords(contents, keywords_lc, automaton=None):
+    """Return the set of (lowercase) keywords contained in any of the (lowercase) document contents"""
+    if automaton is not None:
+        hits = {value for content in contents for _, value in automaton.iter(content)}
+        return {kw for kw in keywords_lc if kw in hits}
+    return {kw for kw in keywords_lc if any(kw in content for content in contents)}
+
+
+def keyword_hit_matrix(all_contents, tests, automaton=None):
+    """
+    Keyword hits for every test, as one padded matrix
+    
+    Args:
+        all_contents: Per test, the list of (lowercase) retrieved document contents
+        tests: Test entries with a 'keywords_lc' tuple
+        automaton: Optional automaton from build_keyword_automaton()
+    
+    Returns:
+        tuple: (boolean hit matrix of shape (num_tests, max keywords), padded with False;
+                coverage percentage per test)
+    """
+    keyword_counts = np.array([len(test['keywords_lc']) for test in tests], dtype=int)
+    hits = np.zeros((len(tests), keyword_counts.max(initial=0)), dtype=bool)
+    for i, (test, contents) in enumerate(zip(tests, all_contents)):
+        found = find_keywords(contents, test['keywords_lc'], automaton)
+        hits[i, :keyword_counts[i]] = [kw in found for kw in test['keywords_lc']]
+    coverages = hits.sum(axis=1) / np.maximum(keyword_counts, 1) * 100
+    return hits, coverages
+
+
+async def retrieve_concurrently(rag, queries, lambda_mult, max_concurrency=8):
+    """
+    Retrieve all queries concurrently (bounded by a semaphore), timing each one individually
+    
+    Returns:
+        list: (docs, elapsed seconds) per query, in input order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def one(query):
+        async with semaphore:
+            start = time.perf_counter_ns()
+            docs = await rag.aretrieve(query, lambda_mult=lambda_mult)
+            return docs, (time.perf_counter_ns() - start) / 1e9
+    
+    return await asyncio.gather(*(one(query) for query in queries))
+
+
+def lowercase_keywords(keywords):
+    """Lowercase (and intern) expected keywords once, when the test data is built"""
+    return tuple(sys.intern(kw.lower()) for kw in keywords)
+
+
+def _user_test(id, query, category, expected_keywords, expected_sticker, expected_score_change):
+    """Build one read-only test entry (lowercase keywords are precomputed)"""
+    return MappingProxyType({
+        "id": id,
+        "query": query,
+        "category": category,
+        "expected_keywords": tuple(expected_keywords),
+        "keywords_lc": lowercase_keywords(expected_keywords),
+        "expected_sticker": expected_sticker,
+        "expected_score_change": expected_score_change,
+    })
+
+
+# User Actual Test Issues
+USER_TESTS = (
+    _user_test(
+        1, "Hi, how are you doing today?", "Greetings",
+        ["petrel", "bird", "fine", "good"],
+        None, "+1 (empathy)"
+    ),
+    _user_test(
+        2, "Where do you usually have your nesting areas?", "Habitat",
+        ["nest", "Madeira", "mountains", "cliffs", "caves"],
+        "🏡 Home", "+1 (knowledge)"
+    ),
+    _user_test(
+        3, "How long do you live approximately?", "Lifespan",
+        ["years", "lifespan", "live", "age"],
+        None, "+1 (deep_interaction)"
+    ),
+    _user_test(
+        4, "Why do you need to abort sometimes to protect your species, that's a very sad thing and I don't quite understand how does it help you", "Protection Strategy",
+        ["conservation", "protection", "breeding", "survival", "predators"],
+        "🌱 Helper (Maybe)", "+1 (conservation_action/empathy)"
+    ),
+    _user_test(
+        5, "How long do you sleep?", "Daily Habits",
+        ["sleep", "rest", "night", "day", "active"],
+        "🌙 Routine (Maybe)", "+1 (knowledge)"
+    ),
+    _user_test(
+        6, "How do I find you?", "Observation Guide",
+        ["Madeira", "mountains", "sea", "observation", "location"],
+        "🏡 Home (If not triggered)", "+1 (personal_engagement)"
+    ),
+    _user_test(
+        7, "Do you have a friend?", "Social",
+        ["mate", "colony", "pair", "social", "alone"],
+        None, "+1 (personal_engagement)"
+    ),
+    _user_test(
+        8, "What do you eat for food and how do you catch it?", "Diet",
+        ["fish", "squid", "food", "catch", "hunt", "sea"],
+        "🍽️ Food", "+1 (knowledge)"
+    ),
+    _user_test(
+        9, "How can I help you and your species thrive?", "Protection Action",
+        ["help", "protect", "conservation", "support", "habitat"],
+        "🌱 Helper", "+1 (conservation_action)"
+    ),
+)
@@ -6,22 +6,36 @@ Usage:
     python vectorize_knowledge_base.py
 
 Features:
-    - Batch processes PDF files
+    - Batch processes PDF files (PyMuPDF text extraction, parallel worker processes)
+    - Streams chunks into the embedding loop (memory bounded by the batch window, not the library)
     - Optimized document splitting (chunk_overlap=200)
     - Qwen Embedding (text-embedding-v3)
     - Progress tracking and error handling
+    - Incremental: only new or changed PDFs are embedded (tracked in <db>/manifest.json)
+    - Resumable: chunk embeddings are cached on disk by content hash (with diskcache installed)
 """
 
+import hashlib
+import json
 import os
 import sys
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
 from dotenv import load_dotenv
 from tqdm import tqdm
-from langchain_community.document_loaders import PyPDFLoader
+from langchain_community.document_loaders import PyMuPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.embeddings import DashScopeEmbeddings
 from langchain_chroma import Chroma
 
+try:
+    import diskcache  # Optional: pip install diskcache
+except ImportError:
+    diskcache = None
+
 # Load environment variables
 load_dotenv()
 
@@ -32,6 +46,28 @@ CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200  # 20% overlap, maintains context continuity
 # Read Embedding model from environment variables (consistent with rag_utils.py)
 EMBEDDING_MODEL = os.getenv("QWEN_EMBEDDING_MODEL", "text-embedding-v3")
+# Chroma's HNSW index settings: MMR only re-ranks the fetch_k candidates returned here,
+# so a wider search beam improves candidate recall at negligible cost.
+# Keep the L2 space: rag_utils converts L2 distances into relevance scores.
+HNSW_METADATA = {
+    "hnsw:space": "l2",
+    "hnsw:M": 16,
+    "hnsw:search_ef": 40,
+}
+# Indexed PDFs (name -> mtime/size/sha256), stored inside the vector store directory
+MANIFEST_NAME = "manifest.json"
+# DashScope limit: batch_size ≤ 10; several batches are embedded concurrently
+EMBEDDING_BATCH_SIZE = 10
+EMBEDDING_WORKERS = 8
+# Chunks read from the stream per round (one batch per worker)
+EMBEDDING_WINDOW = EMBEDDING_BATCH_SIZE * EMBEDDING_WORKERS
+# Recently embedded texts whose vectors are reused for duplicate chunks
+EMBEDDING_REUSE_SIZE = 4096
+# Chunk embeddings persisted across runs (shared with rag_utils' query cache; needs diskcache),
+# so a crashed or repeated run does not pay again for texts it already embedded
+EMBEDDING_CACHE_DIR = ".emb_cache"
+# Per-file success lines are written in one tqdm.write per this many files
+PROGRESS_FLUSH_EVERY = 50
 
 def get_pdf_files(folder_path):
     """Get all PDF files in the folder"""
@@ -47,92 +83,294 @@ def get_pdf_files(folder_path):
     
     return pdf_files
 
-def load_and_split_pdf(pdf_path, text_splitter):
-    """Load and split a single PDF file"""
+def load_manifest(persist_directory):
+    """Load the indexed-files manifest (None if the database has none)"""
     try:
-        loader = PyPDFLoader(str(pdf_path))
-        pages = loader.load()
+        with open(Path(persist_directory) / MANIFEST_NAME, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_manifest(persist_directory, manifest):
+    """Write the indexed-files manifest"""
+    with open(Path(persist_directory) / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+def file_fingerprint(pdf_path, known=None):
+    """
+    Fingerprint a PDF as {mtime, size, sha256}
+    
+    The content hash is only recomputed when mtime or size differ from the known entry.
+    """
+    stat = pdf_path.stat()
+    if known and known.get("mtime") == stat.st_mtime and known.get("size") == stat.st_size:
+        return known
+    
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": digest.hexdigest()}
+
+class LiteralSeparatorTextSplitter(RecursiveCharacterTextSplitter):
+    """
+    RecursiveCharacterTextSplitter for plain-string separators, producing identical chunks
+    
+    The parent escapes every separator and runs a re.search per separator plus a re.split
+    at every recursion level; here presence checks and splits use C-level str operations.
+    The merge / chunk_overlap stitching is the parent's own _merge_splits.
+    """
+    
+    def _split_text(self, text, separators):
+        if self._is_separator_regex:
+            return super()._split_text(text, separators)
+        
+        # Get appropriate separator to use (first one present; "" splits into characters)
+        separator = separators[-1]
+        new_separators = []
+        for i, _s in enumerate(separators):
+            if _s == "":
+                separator = _s
+                break
+            if _s in text:
+                separator = _s
+                new_separators = separators[i + 1:]
+                break
+        
+        splits = self._split_on(text, separator)
         
+        # Now go merging things, recursively splitting longer texts
+        final_chunks = []
+        good_splits = []
+        merge_separator = "" if self._keep_separator else separator
+        for split in splits:
+            if self._length_function(split) < self._chunk_size:
+                good_splits.append(split)
+                continue
+            if good_splits:
+                final_chunks.extend(self._merge_splits(good_splits, merge_separator))
+                good_splits = []
+            if new_separators:
+                final_chunks.extend(self._split_text(split, new_separators))
+            else:
+                final_chunks.append(split)
+        if good_splits:
+            final_chunks.extend(self._merge_splits(good_splits, merge_separator))
+        return final_chunks
+    
+    def _split_on(self, text, separator):
+        """str.split equivalent of langchain's _split_text_with_regex for a literal separator"""
+        if not separator:
+            return list(text)
+        
+        parts = text.split(separator)
+        if self._keep_separator == "end":
+            splits = [part + separator for part in parts[:-1]] + parts[-1:]
+        elif self._keep_separator:
+            splits = parts[:1] + [separator + part for part in parts[1:]]
+        else:
+            splits = parts
+        return [split for split in splits if split != ""]
+
+def load_and_split_pdf(pdf_path, text_splitter):
+    """Load and split a single PDF file page by page, yielding its chunks"""
+    # PyMuPDF extracts text in C (much faster than pure-Python pypdf) and reports total_pages itself
+    loader = PyMuPDFLoader(str(pdf_path))
+    
+    # lazy_load() parses one page at a time, so only the current page is held in memory
+    for i, page in enumerate(loader.lazy_load()):
         # Add metadata to each document
-        for i, page in enumerate(pages):
-            page.metadata.update({
-                "source_file": pdf_path.name,
-                "page": i + 1,
-                "total_pages": len(pages)
-            })
+        page.metadata.update({
+            "source_file": pdf_path.name,
+            "page": i + 1,
+            "total_pages": page.metadata["total_pages"]
+        })
         
         # Split documents
-        chunks = text_splitter.split_documents(pages)
-        return chunks, None
-    
+        yield from text_splitter.split_documents([page])
+
+def _load_and_split_file(pdf_path, text_splitter):
+    """Load and split one PDF in a worker process (chunks, error)"""
+    try:
+        return list(load_and_split_pdf(pdf_path, text_splitter)), None
     except Exception as e:
         return None, str(e)
 
-def vectorize_documents(pdf_files, embeddings, text_splitter):
-    """Vectorize all documents"""
-    all_chunks = []
-    failed_files = []
+def vectorize_documents(pdf_files, embeddings, text_splitter, failed_files):
+    """
+    Stream the chunks of all documents
+    
+    Args:
+        pdf_files: PDF files to load
+        embeddings: Embedding model
+        text_splitter: Text splitter
+        failed_files: List that receives (filename, error) for files that failed to load
+    
+    Yields:
+        Document chunks, file by file in completion order
+    """
+    total_chunks = 0
+    success_lines = []
     
     print(f"\n📚 Starting to process {len(pdf_files)} PDF files...\n")
     
-    # Use tqdm to show progress
-    for pdf_file in tqdm(pdf_files, desc="Processing PDF", unit="file"):
-        chunks, error = load_and_split_pdf(pdf_file, text_splitter)
+    # PDF parsing is CPU-bound and files are independent: load and split them in parallel processes.
+    # Only max_workers files are in flight, so finished-but-unconsumed chunks stay bounded while
+    # the consumer embeds the first files as the next ones are still parsing.
+    max_workers = os.cpu_count() or 1
+    pending_files = iter(pdf_files)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+            tqdm(total=len(pdf_files), desc="Processing PDF", unit="file") as progress:
+        futures = {
+            executor.submit(_load_and_split_file, pdf_file, text_splitter): pdf_file
+            for pdf_file in islice(pending_files, max_workers)
+        }
         
-        if error:
-            failed_files.append((pdf_file.name, error))
-            tqdm.write(f"❌ Failed: {pdf_file.name} - {error}")
-        else:
-            all_chunks.extend(chunks)
-            tqdm.write(f"✅ Success: {pdf_file.name} ({len(chunks)} chunks)")
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                pdf_file = futures.pop(future)
+                try:
+                    chunks, error = future.result()
+                except Exception as e:  # e.g. the worker process died
+                    chunks, error = None, str(e)
+                progress.update(1)
+                
+                for next_file in islice(pending_files, 1):
+                    futures[executor.submit(_load_and_split_file, next_file, text_splitter)] = next_file
+                
+                if error:
+                    failed_files.append((pdf_file.name, error))
+                    tqdm.write(f"❌ Failed: {pdf_file.name} - {error}")
+                else:
+                    success_lines.append(f"✅ Success: {pdf_file.name} ({len(chunks)} chunks)")
+                    if len(success_lines) >= PROGRESS_FLUSH_EVERY:
+                        tqdm.write("\n".join(success_lines))
+                        success_lines.clear()
+                    total_chunks += len(chunks)
+                    yield from chunks
+        
+        if success_lines:
+            tqdm.write("\n".join(success_lines))
     
     print(f"\n📊 Statistics:")
     print(f"  - Successful: {len(pdf_files) - len(failed_files)} files")
     print(f"  - Failed: {len(failed_files)} files")
-    print(f"  - Total chunks: {len(all_chunks)} chunks")
+    print(f"  - Total chunks: {total_chunks} chunks")
     
     if failed_files:
         print(f"\n⚠️  Failed files list:")
         for filename, error in failed_files:
             print(f"  - {filename}: {error}")
-    
-    return all_chunks
 
-def create_vector_store(chunks, embeddings, persist_directory):
-    """Create and persist vector database"""
-    print(f"\n🔄 Creating vector database...")
+def create_vector_store(chunks, embeddings, persist_directory, rebuild=True, stale_files=()):
+    """
+    Create or update and persist vector database
+    
+    Args:
+        chunks: Iterable of new document chunks to embed and add (consumed as a stream)
+        embeddings: Embedding model
+        persist_directory: Vector store path
+        rebuild: Clear the existing database first (its contents are unknown without a manifest)
+        stale_files: Source file names whose existing chunks are removed first (PDFs about to be loaded,
+            deleted PDFs); ignored when rebuilding
+    
+    Returns:
+        (vectordb, number of chunks added)
+    """
+    print(f"\n🔄 {'Creating' if rebuild else 'Updating'} vector database...")
     print(f"  - Vector store path: {persist_directory}")
     print(f"  - Embedding model: {EMBEDDING_MODEL}")
-    print(f"  - Document chunk count: {len(chunks)}")
     
     try:
         # Clear old database (if exists)
-        if Path(persist_directory).exists():
+        if rebuild and Path(persist_directory).exists():
             import shutil
             shutil.rmtree(persist_directory)
             print(f"  - Cleared old database")
         
-        # Batch process vectorization (DashScope limit: batch_size ≤ 10)
-        batch_size = 10
-        vectordb = None
-        
-        for i in tqdm(range(0, len(chunks), batch_size), desc="Vectorizing", unit="batch"):
-            batch = chunks[i:i + batch_size]
-            
-            if vectordb is None:
-                # First time creation
-                vectordb = Chroma.from_documents(
-                    documents=batch,
-                    embedding=embeddings,
-                    persist_directory=persist_directory,
-                    collection_name="zinos_petrel_knowledge"
+        vectordb = Chroma(
+            collection_name="zinos_petrel_knowledge",
+            embedding_function=embeddings,
+            persist_directory=persist_directory,
+            collection_metadata=HNSW_METADATA
+        )
+        
+        # Drop any chunks of the PDFs about to be (re)loaded or removed since the last run. New PDFs are
+        # included: a crashed run may have written part of them before the manifest was updated.
+        if not rebuild:
+            for filename in stale_files:
+                vectordb._collection.delete(where={"source_file": filename})
+            if stale_files:
+                print(f"  - Cleared existing chunks of {len(stale_files)} files")
+        
+        def embed_batch(texts):
+            return embeddings.embed_documents(texts)
+        
+        # Keyed by model as well, so switching embedding models never returns stale vectors
+        disk_cache = diskcache.Cache(EMBEDDING_CACHE_DIR) if diskcache is not None else None
+        
+        def disk_key(key):
+            return f"document:{EMBEDDING_MODEL}:{key}"
+        
+        # Identical chunk texts (headers, boilerplate, repeated captions) are embedded only once;
+        # recently embedded vectors are kept (LRU) so repeats in later windows reuse them too
+        known_vectors = OrderedDict()
+        chunk_stream = iter(chunks)
+        added = reused = cached = 0
+        
+        # Embedding requests are network-bound: read EMBEDDING_WINDOW chunks at a time and keep
+        # EMBEDDING_WORKERS batches in flight (the pool size also caps the request rate)
+        with ThreadPoolExecutor(max_workers=EMBEDDING_WORKERS) as executor, \
+                tqdm(desc="Vectorizing", unit="chunk") as progress:
+            while window := list(islice(chunk_stream, EMBEDDING_WINDOW)):
+                keys = [hashlib.sha1(chunk.page_content.encode("utf-8")).hexdigest() for chunk in window]
+                
+                # One text per new key: served from the disk cache, or embedded in batches of EMBEDDING_BATCH_SIZE
+                new_texts = {}
+                for key, chunk in zip(keys, window):
+                    if key in known_vectors or key in new_texts:
+                        continue
+                    vector = disk_cache.get(disk_key(key)) if disk_cache is not None else None
+                    if vector is not None:
+                        known_vectors[key] = vector
+                        cached += 1
+                    else:
+                        new_texts[key] = chunk.page_content
+                new_keys = list(new_texts)
+                batches = [
+                    [new_texts[key] for key in new_keys[i:i + EMBEDDING_BATCH_SIZE]]
+                    for i in range(0, len(new_keys), EMBEDDING_BATCH_SIZE)
+                ]
+                vectors = [vector for batch_vectors in executor.map(embed_batch, batches) for vector in batch_vectors]
+                
+                for key, vector in zip(new_keys, vectors):
+                    known_vectors[key] = vector
+                    if disk_cache is not None:
+                        disk_cache.set(disk_key(key), vector)
+                for key in keys:
+                    known_vectors.move_to_end(key)
+                window_vectors = [known_vectors[key] for key in keys]
+                while len(known_vectors) > EMBEDDING_REUSE_SIZE:
+                    known_vectors.popitem(last=False)
+                
+                # Every copy of a text is still stored (with its own source/page), sharing one vector
+                vectordb._collection.add(
+                    ids=[str(uuid.uuid4()) for _ in window],
+                    embeddings=window_vectors,
+                    documents=[chunk.page_content for chunk in window],
+                    metadatas=[chunk.metadata for chunk in window]
                 )
-            else:
-                # Add to existing database
-                vectordb.add_documents(batch)
+                added += len(window)
+                reused += len(window) - len(new_keys)
+                progress.update(len(window))
+        
+        if disk_cache is not None:
+            disk_cache.close()
         
-        print(f"\n✅ Vector database created successfully!")
-        return vectordb
+        print(f"  - Document chunk count: {added} ({reused} reused an embedding, {cached} from the disk cache)")
+        print(f"\n✅ Vector database {'created' if rebuild else 'updated'} successfully!")
+        return vectordb, added
     
     except Exception as e:
         print(f"\n❌ Vector database creation failed: {str(e)}")
@@ -179,6 +417,28 @@ def main():
     pdf_files = get_pdf_files(PDF_FOLDER)
     print(f"✅ Found {len(pdf_files)} PDF files")
     
+    # Compare against the manifest of the last run: only new or changed PDFs need embedding
+    manifest = load_manifest(VECTOR_DB_PATH)
+    rebuild = manifest is None
+    known = manifest or {}
+    fingerprints = {pdf_file.name: file_fingerprint(pdf_file, known.get(pdf_file.name)) for pdf_file in pdf_files}
+    pdf_files = [
+        pdf_file for pdf_file in pdf_files
+        if known.get(pdf_file.name, {}).get("sha256") != fingerprints[pdf_file.name]["sha256"]
+    ]
+    removed_files = [name for name in known if name not in fingerprints]
+    # A rebuild starts from an empty collection, so there is nothing to clear
+    stale_files = [] if rebuild else [pdf_file.name for pdf_file in pdf_files] + removed_files
+    
+    if rebuild:
+        print(f"✅ No manifest found, building the database from scratch")
+    else:
+        print(f"✅ Incremental update: {len(pdf_files)} new/changed, {len(removed_files)} removed, "
+              f"{len(fingerprints) - len(pdf_files)} unchanged")
+        if not pdf_files and not removed_files:
+            print(f"\n🎉 Vector store is up to date: {VECTOR_DB_PATH}")
+            return
+    
     # 3. Initialize Embeddings
     print(f"\n🔧 Initializing Embedding model...")
     embeddings = DashScopeEmbeddings(
@@ -188,22 +448,29 @@ def main():
     print(f"✅ Using model: {EMBEDDING_MODEL}")
     
     # 4. Initialize text splitter
-    text_splitter = RecursiveCharacterTextSplitter(
+    text_splitter = LiteralSeparatorTextSplitter(
         chunk_size=CHUNK_SIZE,
         chunk_overlap=CHUNK_OVERLAP,
         separators=["\n\n", "\n", ". ", " ", ""]
     )
     print(f"✅ Text splitting configuration: chunk_size={CHUNK_SIZE}, overlap={CHUNK_OVERLAP}")
     
-    # 5. Vectorize documents
-    chunks = vectorize_documents(pdf_files, embeddings, text_splitter)
+    # 5 & 6. Vectorize documents, streaming chunks straight into the (created or updated) vector database
+    failed_files = []
+    chunks = vectorize_documents(pdf_files, embeddings, text_splitter, failed_files)
+    vectordb, added_chunks = create_vector_store(
+        chunks, embeddings, VECTOR_DB_PATH, rebuild=rebuild, stale_files=stale_files
+    )
     
-    if not chunks:
+    if not added_chunks and not removed_files:
         print("❌ No documents processed successfully")
         sys.exit(1)
     
-    # 6. Create vector database
-    vectordb = create_vector_store(chunks, embeddings, VECTOR_DB_PATH)
+    # Record what is indexed now; failed files are left out so the next run retries them
+    failed_names = {filename for filename, _ in failed_files}
+    save_manifest(VECTOR_DB_PATH, {
+        name: fingerprint for name, fingerprint in fingerprints.items() if name not in failed_names
+    })
     
     # 7. Test retrieval
     test_retrieval(vectordb)
@@ -212,7 +479,7 @@ def main():
     print("🎉 Vectorization completed!")
     print("=" * 60)
     print(f"\n📁 Vector store location: {VECTOR_DB_PATH}")
-    print(f"📊 Total document chunks: {len(chunks)}")
+    print(f"📊 Document chunks added: {added_chunks} (total in store: {vectordb._collection.count()})")
     print(f"\nNext step: Run 'streamlit run main.py' to start using!")
 
 if __name__ == "__main__":